@@ -1,117 +1,42 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
 import math
-import re
+import os
 from collections import Counter
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import chain
 from pathlib import Path
+from typing import Iterable, Iterator
 
+import numpy as np
 from pypdf import PdfReader
 
+from text_tokens import STOPWORDS, TOKEN_RE, iter_tokens, tokenize  # noqa: F401 (tokenize – API modułu)
+
 
 WORKSPACE = Path(__file__).resolve().parent
+QUESTIONS_FILE = WORKSPACE / "test_python_baza_pytan.json"
 
+# Duże prezentacje dzielimy na zakresy stron, żeby jeden plik nie blokował puli.
+PAGES_PER_SHARD = 25
 
-STOPWORDS = {
-    # PL (minimalny zestaw + typowe słowa z prezentacji/testów)
-    "i",
-    "oraz",
-    "a",
-    "ale",
-    "albo",
-    "lub",
-    "że",
-    "to",
-    "te",
-    "ta",
-    "ten",
-    "tę",
-    "tych",
-    "tym",
-    "w",
-    "we",
-    "na",
-    "do",
-    "od",
-    "dla",
-    "po",
-    "pod",
-    "nad",
-    "z",
-    "ze",
-    "o",
-    "u",
-    "jak",
-    "jaki",
-    "jaka",
-    "jakie",
-    "czy",
-    "co",
-    "kiedy",
-    "gdzie",
-    "który",
-    "która",
-    "które",
-    "których",
-    "którym",
-    "się",
-    "nie",
-    "tak",
-    "taka",
-    "takie",
-    "tego",
-    "tej",
-    "temu",
-    "jest",
-    "są",
-    "być",
-    "bywa",
-    "będzie",
-    "będą",
-    "może",
-    "można",
-    "np",
-    "itp",
-    "etc",
-    "przykład",
-    "przyklad",
-    "zadanie",
-    "pytanie",
-    "test",
-    # EN (typowe w slajdach)
-    "the",
-    "and",
-    "or",
-    "a",
-    "an",
-    "to",
-    "of",
-    "in",
-    "on",
-    "for",
-    "with",
-    "as",
-    "is",
-    "are",
-    "be",
-    "this",
-    "that",
-    "these",
-    "those",
-    "from",
-    "by",
-    "at",
-    "it",
-    "its",
-    "into",
-    "about",
-    "example",
-    "examples",
-    "python",
-}
+# Cache liczby znaków i tokenów (klucz: hash zawartości PDF + wersja tokenizera).
+CACHE_DIR = WORKSPACE / ".pdf_cache"
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Podbić przy każdej zmianie tokenize (text_tokens), której nie widać w TOKEN_RE/STOPWORDS.
+TOKENIZER_VERSION = 1
+# Podbić przy zmianie struktury wpisu w cache.
+CACHE_FORMAT = 3
+# Podbić przy zmianie struktury plików w .pdf_cache/index (stan korpusu, indeks odwrócony).
+STATE_FORMAT = 2
 
 
-TOKEN_RE = re.compile(r"[A-Za-zĄĆĘŁŃÓŚŹŻąćęłńóśźż_]{2,}")
+# Liczniki tokenów per strona: (numer strony od 1, tokeny).
+PageTokens = list[tuple[int, Counter[str]]]
 
 
 @dataclass(frozen=True)
@@ -119,37 +44,314 @@ class DocStats:
     name: str
     text_len: int
     tokens: Counter[str]
+    pages: PageTokens = field(default_factory=list)
+    digest: str = ""
 
 
-def extract_pdf_text(pdf_path: Path) -> str:
+def iter_pdf_pages(pdf_path: Path, start: int = 0, stop: int | None = None) -> Iterator[tuple[int, str]]:
+    # Niepuste teksty stron z zakresu [start, stop) z numerem strony, po jednej stronie naraz.
     reader = PdfReader(str(pdf_path))
-    parts: list[str] = []
-    for page in reader.pages:
+    for page_no, page in enumerate(reader.pages[start:stop], start + 1):
         txt = page.extract_text() or ""
         if txt:
-            parts.append(txt)
-    return "\n".join(parts)
+            yield page_no, txt
 
 
-def normalize_text(s: str) -> str:
-    # ujednolicenie spacji + minusów/dashy
-    s = s.replace("\u00ad", "")  # soft hyphen
-    s = s.replace("\u2013", "-").replace("\u2014", "-")
-    s = re.sub(r"[ \t]+", " ", s)
-    return s
+def extract_pdf_text(pdf_path: Path) -> str:
+    return "\n".join(txt for _, txt in iter_pdf_pages(pdf_path))
 
 
-def tokenize(s: str) -> list[str]:
-    s = normalize_text(s).lower()
-    tokens = TOKEN_RE.findall(s)
-    out: list[str] = []
-    for t in tokens:
-        if t in STOPWORDS:
-            continue
-        if len(t) <= 2:
+@dataclass(frozen=True)
+class ShardStats:
+    n_chars: int
+    pages: PageTokens  # tylko niepuste strony
+
+
+def count_pdf_tokens(pdf_path: Path, start: int = 0, stop: int | None = None) -> ShardStats:
+    # Strumieniowo: tokeny strony trafiają od razu do jej licznika, pełny tekst nie jest sklejany.
+    pages: PageTokens = []
+    n_chars = 0
+    for page_no, txt in iter_pdf_pages(pdf_path, start, stop):
+        n_chars += len(txt)
+        pages.append((page_no, Counter(iter_tokens(txt))))
+    return ShardStats(n_chars, pages)
+
+
+def _count_shard(shard: tuple[Path, int, int]) -> ShardStats:
+    pdf_path, start, stop = shard
+    return count_pdf_tokens(pdf_path, start, stop)
+
+
+def plan_shards(pdf_paths: list[Path], *, pages_per_shard: int = PAGES_PER_SHARD) -> list[tuple[Path, int, int]]:
+    # Jeden shard na mały dokument, zakresy stron dla dużych prezentacji.
+    shards: list[tuple[Path, int, int]] = []
+    for p in pdf_paths:
+        n_pages = len(PdfReader(str(p)).pages)
+        if n_pages <= pages_per_shard:
+            shards.append((p, 0, n_pages))
             continue
-        out.append(t)
-    return out
+        for start in range(0, n_pages, pages_per_shard):
+            shards.append((p, start, min(start + pages_per_shard, n_pages)))
+    return shards
+
+
+def count_pdf_tokens_many(pdf_paths: list[Path], *, workers: int | None = None) -> list[tuple[int, PageTokens]]:
+    # Równoległa ekstrakcja + tokenizacja; wynik (liczba znaków, tokeny stron) w kolejności `pdf_paths`.
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or not pdf_paths:
+        shards = [(p, 0, None) for p in pdf_paths]
+        stats = map(_count_shard, shards)
+        return _merge_shards(pdf_paths, shards, stats)
+
+    shards = plan_shards(pdf_paths)
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+        # map() zachowuje kolejność shardów, więc wynik jest deterministyczny.
+        return _merge_shards(pdf_paths, shards, pool.map(_count_shard, shards))
+
+
+def _merge_shards(
+    pdf_paths: list[Path], shards: list[tuple[Path, int, int | None]], stats: Iterable[ShardStats]
+) -> list[tuple[int, PageTokens]]:
+    chars = dict.fromkeys(pdf_paths, 0)
+    pages: dict[Path, PageTokens] = {p: [] for p in pdf_paths}
+    for (p, _, _), st in zip(shards, stats):
+        chars[p] += st.n_chars
+        pages[p].extend(st.pages)
+    # liczba znaków jak dla stron sklejonych "\n" (zgodnie z extract_pdf_text)
+    return [(chars[p] + max(0, len(pages[p]) - 1), pages[p]) for p in pdf_paths]
+
+
+def sum_pages(pages: PageTokens) -> Counter[str]:
+    tokens: Counter[str] = Counter()
+    for _, c in pages:
+        tokens.update(c)
+    return tokens
+
+
+def tokenizer_fingerprint() -> str:
+    h = hashlib.sha256()
+    h.update(f"{TOKENIZER_VERSION}\n{CACHE_FORMAT}\n{TOKEN_RE.pattern}\n".encode("utf-8"))
+    h.update("\n".join(sorted(STOPWORDS)).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class TextCache:
+    # Trwały cache: jeden plik JSON na dokument, usuwanie najdawniej używanych po przekroczeniu limitu.
+
+    def __init__(self, root: Path = CACHE_DIR, *, max_bytes: int = CACHE_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.fingerprint = tokenizer_fingerprint()
+
+    def key(self, digest: str) -> str:
+        return f"{digest}-{self.fingerprint}"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    @property
+    def index_path(self) -> Path:
+        # Poza globem "*.json" katalogu głównego, więc evict() go nie usuwa.
+        return self.root / "index" / "inverted_index.json"
+
+    @property
+    def state_path(self) -> Path:
+        return self.root / "index" / "coverage_state.json"
+
+    @property
+    def digests_path(self) -> Path:
+        return self.root / "index" / "digests.json"
+
+    def digests(self, paths: list[Path]) -> dict[Path, str]:
+        # SHA-256 liczymy tylko dla plików, którym zmienił się rozmiar lub mtime od poprzedniego uruchomienia.
+        try:
+            with open(self.digests_path, "r", encoding="utf-8") as f:
+                known = json.load(f)
+        except (OSError, ValueError):
+            known = {}
+        result: dict[Path, str] = {}
+        stamps: dict[str, list] = {}
+        for p in paths:
+            st = p.stat()
+            key = str(p.resolve())
+            entry = known.get(key)
+            if isinstance(entry, list) and entry[:2] == [st.st_size, st.st_mtime_ns]:
+                result[p] = entry[2]
+            else:
+                result[p] = file_digest(p)
+            stamps[key] = [st.st_size, st.st_mtime_ns, result[p]]
+        if stamps != known:
+            self.digests_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_json_atomic(self.digests_path, stamps)
+        return result
+
+    def get(self, key: str) -> tuple[int, PageTokens] | None:
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            hit = data["text_len"], [(page_no, Counter(c)) for page_no, c in data["pages"]]
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(path)  # mtime = ostatnie użycie (LRU)
+        return hit
+
+    def put(self, key: str, text_len: int, pages: PageTokens) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self._entry_path(key), {"text_len": text_len, "pages": pages})
+
+    def evict(self) -> None:
+        if not self.root.is_dir():
+            return
+        entries = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.root.glob("*.json")]
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        if not self.root.is_dir():
+            return
+        for p in self.root.glob("*.json"):
+            p.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+        self.state_path.unlink(missing_ok=True)
+        self.digests_path.unlink(missing_ok=True)
+
+
+def _write_json_atomic(path: Path, data: object) -> None:
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_documents(
+    pdf_paths: list[Path],
+    *,
+    workers: int | None = None,
+    cache: TextCache | None = None,
+    digests: dict[Path, str] | None = None,
+) -> list[DocStats]:
+    # Z cache bierzemy trafienia, ekstrahujemy (równolegle) tylko nowe/zmienione pliki.
+    results: dict[Path, tuple[int, PageTokens]] = {}
+    if digests is None:
+        digests = cache.digests(pdf_paths) if cache is not None else {p: file_digest(p) for p in pdf_paths}
+    keys: dict[Path, str] = {}
+    if cache is not None:
+        for p in pdf_paths:
+            keys[p] = cache.key(digests[p])
+            hit = cache.get(keys[p])
+            if hit is not None:
+                results[p] = hit
+
+    misses = [p for p in pdf_paths if p not in results]
+    for p, (text_len, pages) in zip(misses, count_pdf_tokens_many(misses, workers=workers)):
+        results[p] = (text_len, pages)
+        if cache is not None:
+            cache.put(keys[p], text_len, pages)
+    if cache is not None and misses:
+        cache.evict()
+
+    return [
+        DocStats(name=p.name, text_len=text_len, tokens=sum_pages(pages), pages=pages, digest=digests[p])
+        for p in pdf_paths
+        for text_len, pages in [results[p]]
+    ]
+
+
+class InvertedIndex:
+    # token -> [(dokument, strona, liczba wystąpień)] w kolejności dokumentów i stron.
+    # Przy zmianie korpusu wymieniamy tylko wpisy dodanych/zmienionych/usuniętych PDF-ów.
+
+    def __init__(self) -> None:
+        self.fingerprint = tokenizer_fingerprint()
+        self.docs: dict[str, str] = {}  # nazwa -> digest
+        self.postings: dict[str, list[tuple[str, int, int]]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> InvertedIndex:
+        index = cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get("format") != STATE_FORMAT or data.get("fingerprint") != index.fingerprint:
+            return index
+        index.docs = data["docs"]
+        index.postings = {t: [tuple(p) for p in refs] for t, refs in data["postings"].items()}
+        return index
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(path, {
+            "format": STATE_FORMAT,
+            "fingerprint": self.fingerprint,
+            "docs": self.docs,
+            "postings": self.postings,
+        })
+
+    def stale(self, current: dict[str, str]) -> list[str]:
+        return [n for n, digest in current.items() if self.docs.get(n) != digest]
+
+    def update(self, current: dict[str, str], fresh: dict[str, DocStats]) -> bool:
+        # `current`: nazwa -> digest wykładów w kolejności raportu; `fresh` musi zawierać pliki ze stale(current).
+        dropped = {n for n, digest in self.docs.items() if current.get(n) != digest}
+        if dropped:
+            for t, refs in list(self.postings.items()):
+                kept = [r for r in refs if r[0] not in dropped]
+                if not kept:
+                    del self.postings[t]
+                elif len(kept) != len(refs):
+                    self.postings[t] = kept
+            for n in dropped:
+                del self.docs[n]
+        added = self.stale(current)
+        touched: set[str] = set()
+        for n in added:
+            d = fresh[n]
+            for page_no, c in d.pages:
+                for t, k in c.items():
+                    self.postings.setdefault(t, []).append((n, page_no, k))
+                    touched.add(t)
+            self.docs[n] = d.digest
+        # Dopisane wpisy trafiają na koniec list – przywracamy kolejność, jaką dałaby budowa od zera.
+        order = {n: i for i, n in enumerate(current)}
+        for t in touched:
+            self.postings[t].sort(key=lambda r: (order[r[0]], r[1]))
+        return bool(dropped or added)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.postings
+
+    def lookup(self, token: str) -> list[tuple[str, int, int]]:
+        return self.postings.get(token, [])
+
+
+def format_locations(refs: list[tuple[str, int, int]], *, max_pages: int = 8) -> str:
+    # "W3.pdf s. 4, 5; W7.pdf s. 2" – strony pogrupowane per dokument.
+    by_doc: dict[str, list[int]] = {}
+    for name, page_no, _ in refs:
+        by_doc.setdefault(name, []).append(page_no)
+    parts = []
+    for name, pages in by_doc.items():
+        shown = ", ".join(map(str, pages[:max_pages]))
+        if len(pages) > max_pages:
+            shown += ", …"
+        parts.append(f"{name} s. {shown}")
+    return "; ".join(parts)
 
 
 def cosine_similarity(a: Counter[str], b: Counter[str]) -> float:
@@ -167,27 +369,419 @@ def cosine_similarity(a: Counter[str], b: Counter[str]) -> float:
     return dot / (na * nb)
 
 
+# Limit elementów jednego gęstego bloku wierszy w SparseMatrix.dot_t (~64 MB float64).
+DOT_BLOCK_ELEMENTS = 8_000_000
+# Szacunkowo ile razy element zbierany po indeksach jest droższy od elementu mnożenia BLAS.
+SPARSE_GATHER_COST = 10
+
+
+def build_vocabulary(counters: list[Counter[str]], base: dict[str, int] | None = None) -> dict[str, int]:
+    # Tokeny z `base` (np. słownika zapisanego w stanie korpusu) zachowują swoje kolumny, nowe trafiają na koniec.
+    vocab: dict[str, int] = dict(base) if base else {}
+    for c in counters:
+        for t in c:
+            if t not in vocab:
+                vocab[t] = len(vocab)
+    return vocab
+
+
+@dataclass(frozen=True)
+class SparseMatrix:
+    # Macierz CSR: wiersz = dokument, kolumna = indeks tokenu w słowniku.
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    n_cols: int
+    norms: np.ndarray
+
+    @classmethod
+    def from_counters(cls, counters: list[Counter[str]], vocab: dict[str, int]) -> SparseMatrix:
+        indptr = np.zeros(len(counters) + 1, dtype=np.int64)
+        indices: list[int] = []
+        data: list[float] = []
+        for i, c in enumerate(counters):
+            for t, v in c.items():
+                j = vocab.get(t)
+                if j is not None and v:
+                    indices.append(j)
+                    data.append(v)
+            indptr[i + 1] = len(indices)
+        return cls.from_csr(indptr, np.asarray(indices, dtype=np.int64), np.asarray(data, dtype=np.float64), len(vocab))
+
+    @classmethod
+    def from_csr(cls, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_cols: int) -> SparseMatrix:
+        return cls(indptr, indices, data, n_cols, _row_norms(indptr, data))
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def _dense_rows(self, start: int, stop: int) -> np.ndarray:
+        out = np.zeros((stop - start, self.n_cols))
+        lo, hi = self.indptr[start], self.indptr[stop]
+        rows = np.repeat(np.arange(stop - start), np.diff(self.indptr[start : stop + 1]))
+        out[rows, self.indices[lo:hi]] = self.data[lo:hi]
+        return out
+
+    def dot_t(self, other: SparseMatrix) -> np.ndarray:
+        # self @ other.T jako gęsta macierz (self.n_rows, other.n_rows).
+        # `other` rozwijamy do postaci gęstej blokami wierszy, więc pamięć jest ograniczona
+        # przez DOT_BLOCK_ELEMENTS niezależnie od rozmiaru korpusu. Gęste wiersze self
+        # (wykłady) mnożymy przez BLAS; bardzo rzadkie (np. krótkie pytania) – zbierając
+        # tylko niezerowe kolumny, co kosztuje ~nnz(self) zamiast n_rows * n_cols.
+        out = np.zeros((self.n_rows, other.n_rows))
+        block = max(1, DOT_BLOCK_ELEMENTS // max(1, self.n_cols))
+        gather = self.data.size * SPARSE_GATHER_COST < self.n_rows * self.n_cols
+        for b0 in range(0, other.n_rows, block):
+            b1 = min(b0 + block, other.n_rows)
+            right_t = other._dense_rows(b0, b1).T
+            if gather:
+                # ciągłe wiersze right_t – indeksowanie po kolumnach słownika czyta pamięć sekwencyjnie
+                self._gather_dot(np.ascontiguousarray(right_t), out[:, b0:b1])
+                continue
+            for a0 in range(0, self.n_rows, block):
+                a1 = min(a0 + block, self.n_rows)
+                out[a0:a1, b0:b1] = self._dense_rows(a0, a1) @ right_t
+        return out
+
+    def _gather_dot(self, right_t: np.ndarray, out: np.ndarray) -> None:
+        # out = self @ right_t dla right_t o kształcie (n_cols, b), porcjami po ~DOT_BLOCK_ELEMENTS.
+        step = max(1, DOT_BLOCK_ELEMENTS // max(1, right_t.shape[1]))
+        a0 = 0
+        while a0 < self.n_rows:
+            last = int(np.searchsorted(self.indptr, self.indptr[a0] + step, side="right")) - 1
+            a1 = min(max(a0 + 1, last), self.n_rows)
+            lo, hi = self.indptr[a0], self.indptr[a1]
+            if hi > lo:
+                products = self.data[lo:hi, None] * right_t[self.indices[lo:hi]]
+                starts = self.indptr[a0:a1] - lo
+                nonempty = self.indptr[a0 + 1 : a1 + 1] > self.indptr[a0:a1]
+                out[a0:a1][nonempty] = np.add.reduceat(products, starts[nonempty], axis=0)
+            a0 = a1
+
+    def binary(self) -> SparseMatrix:
+        # 1 dla każdego występującego tokenu – iloczyn daje liczbę wspólnych unikalnych tokenów.
+        return SparseMatrix.from_csr(self.indptr, self.indices, np.ones_like(self.data), self.n_cols)
+
+    def cosine(self, other: SparseMatrix) -> np.ndarray:
+        denom = self.norms[:, None] * other.norms[None, :]
+        dots = self.dot_t(other)
+        return np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+
+
+# Schematy ważenia tokenów dla podobieństwa kosinusowego.
+WEIGHTINGS = {
+    "raw": "częstości tokenów",
+    "tfidf": "TF-IDF",
+    "bm25": "BM25",
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+@dataclass(frozen=True)
+class DocumentFrequencyIndex:
+    # Liczone raz na korpusie wykładów; te same wagi trafiają do wszystkich metryk raportu.
+    n_docs: int
+    df: np.ndarray
+    avg_doc_len: float
+
+    @classmethod
+    def from_matrix(cls, corpus: SparseMatrix) -> DocumentFrequencyIndex:
+        # W CSR każda para (wiersz, kolumna) występuje raz, więc bincount kolumn = df.
+        df = np.bincount(corpus.indices, minlength=corpus.n_cols)
+        avg = float(corpus.data.sum() / corpus.n_rows) if corpus.n_rows else 0.0
+        return cls(corpus.n_rows, df, avg)
+
+    def idf(self, weighting: str) -> np.ndarray:
+        if weighting == "bm25":
+            return np.log1p((self.n_docs - self.df + 0.5) / (self.df + 0.5))
+        # wygładzone idf (jak w scikit-learn): termy spoza korpusu nie dają dzielenia przez 0
+        return np.log((self.n_docs + 1) / (self.df + 1)) + 1.0
+
+    def apply(self, m: SparseMatrix, weighting: str) -> SparseMatrix:
+        if weighting == "raw":
+            return m
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Nieznany schemat ważenia: {weighting}")
+        idf = self.idf(weighting)[m.indices]
+        if weighting == "tfidf":
+            return SparseMatrix.from_csr(m.indptr, m.indices, m.data * idf, m.n_cols)
+        doc_len = np.repeat(_row_sums(m.indptr, m.data), np.diff(m.indptr))
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_len / (self.avg_doc_len or 1.0))
+        data = idf * m.data * (BM25_K1 + 1.0) / (m.data + norm)
+        return SparseMatrix.from_csr(m.indptr, m.indices, data, m.n_cols)
+
+
+def _row_sums(indptr: np.ndarray, data: np.ndarray) -> np.ndarray:
+    sums = np.zeros(len(indptr) - 1)
+    nonempty = indptr[1:] > indptr[:-1]
+    if data.size:
+        sums[nonempty] = np.add.reduceat(data, indptr[:-1][nonempty])
+    return sums
+
+
+def _row_norms(indptr: np.ndarray, data: np.ndarray) -> np.ndarray:
+    return np.sqrt(_row_sums(indptr, data * data))
+
+
 def top_keywords(counter: Counter[str], *, k: int = 60, min_len: int = 3) -> list[tuple[str, int]]:
     items = [(t, c) for (t, c) in counter.items() if len(t) >= min_len]
     items.sort(key=lambda x: (-x[1], x[0]))
     return items[:k]
 
 
-def compute_coverage(test_tokens: Counter[str], lecture_tokens: Counter[str]) -> float:
-    # Pokrycie = odsetek unikalnych tokenów testu (z sensowną częstością),
-    # które występują w wykładach.
-    # Próg 2 usuwa „śmieci”/pojedyncze literówki.
+def coverage_terms(test_tokens: Counter[str]) -> set[str]:
+    # Unikalne tokeny testu z sensowną częstością – próg 2 usuwa „śmieci”/pojedyncze literówki.
     test_set = {t for t, c in test_tokens.items() if c >= 2 and len(t) >= 3}
     if not test_set:
         test_set = {t for t, c in test_tokens.items() if c >= 1 and len(t) >= 3}
+    return test_set
+
+
+def compute_coverage(test_tokens: Counter[str] | set[str], lecture_tokens: Counter[str]) -> float:
+    # Pokrycie = odsetek unikalnych tokenów testu (z sensowną częstością),
+    # które występują w wykładach. Można podać gotowy zbiór z coverage_terms(),
+    # żeby nie budować go od nowa dla każdego wykładu.
+    test_set = test_tokens if isinstance(test_tokens, set) else coverage_terms(test_tokens)
     if not test_set:
         return 0.0
-    lec_set = {t for t, c in lecture_tokens.items() if c >= 1 and len(t) >= 3}
-    inter = len(test_set & lec_set)
+    inter = sum(1 for t in test_set if lecture_tokens.get(t, 0) >= 1)
     return 100.0 * inter / len(test_set)
 
 
-def main() -> None:
+class CoverageState:
+    # Trwały stan korpusu wykładów: słownik tokenów, wiersze CSR (tokeny per wykład), agregat tokenów,
+    # df i pokrycie per wykład. Przy zmianie korpusu nakładamy tylko różnice dla dodanych/zmienionych/usuniętych
+    # PDF-ów; starą wersję odejmujemy z zapisanego wiersza, więc niezmienionych plików w ogóle nie wczytujemy.
+
+    def __init__(self) -> None:
+        self.fingerprint = tokenizer_fingerprint()
+        self.docs: dict[str, str] = {}  # nazwa -> digest
+        self.vocab: list[str] = []  # kolumna -> token
+        self.token_ids: dict[str, int] = {}
+        self.rows: dict[str, tuple[list[int], list[int]]] = {}  # nazwa -> (kolumny, liczności)
+        self.lecture_all: Counter[str] = Counter()
+        self.df: Counter[str] = Counter()
+        self.test_digest = ""
+        self.coverage: dict[str, float] = {}
+        self.updated: list[str] = []  # wykłady przeliczone w ostatnim update()
+
+    @classmethod
+    def load(cls, path: Path) -> CoverageState:
+        state = cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return state
+        if data.get("format") != STATE_FORMAT or data.get("fingerprint") != state.fingerprint:
+            return state
+        state.docs = data["docs"]
+        state.vocab = data["vocab"]
+        state.token_ids = {t: i for i, t in enumerate(state.vocab)}
+        state.rows = {n: (indices, counts) for n, (indices, counts) in data["rows"].items()}
+        state.lecture_all = Counter(data["lecture_all"])
+        state.df = Counter(data["df"])
+        state.test_digest = data["test_digest"]
+        state.coverage = data["coverage"]
+        return state
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(path, {
+            "format": STATE_FORMAT,
+            "fingerprint": self.fingerprint,
+            "docs": self.docs,
+            "vocab": self.vocab,
+            "rows": self.rows,
+            "lecture_all": self.lecture_all,
+            "df": self.df,
+            "test_digest": self.test_digest,
+            "coverage": self.coverage,
+        })
+
+    def stale(self, current: dict[str, str]) -> list[str]:
+        return [n for n, digest in current.items() if self.docs.get(n) != digest]
+
+    def tokens(self, name: str) -> Counter[str]:
+        indices, counts = self.rows[name]
+        return Counter(dict(zip(map(self.vocab.__getitem__, indices), counts)))
+
+    def n_tokens(self, name: str) -> int:
+        return sum(self.rows[name][1])
+
+    def matrix(self, names: list[str], n_cols: int) -> SparseMatrix:
+        # Macierz CSR wykładów prosto z zapisanych wierszy; `n_cols` >= len(vocab) (słownik rozszerzony o zapytania).
+        indptr = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum([len(self.rows[n][0]) for n in names], out=indptr[1:])
+        nnz = int(indptr[-1])
+        indices = np.fromiter(chain.from_iterable(self.rows[n][0] for n in names), dtype=np.int64, count=nnz)
+        data = np.fromiter(chain.from_iterable(self.rows[n][1] for n in names), dtype=np.float64, count=nnz)
+        return SparseMatrix.from_csr(indptr, indices, data, n_cols)
+
+    def _add(self, tokens: Counter[str]) -> None:
+        self.lecture_all.update(tokens)
+        self.df.update(tokens.keys())
+
+    def _subtract(self, tokens: Counter[str]) -> None:
+        self.lecture_all.subtract(tokens)
+        self.df.subtract(tokens.keys())
+        for t in tokens:
+            if self.lecture_all[t] <= 0:
+                del self.lecture_all[t]
+            if self.df[t] <= 0:
+                del self.df[t]
+
+    def _row(self, tokens: Counter[str]) -> tuple[list[int], list[int]]:
+        indices: list[int] = []
+        counts: list[int] = []
+        for t, c in tokens.items():
+            j = self.token_ids.get(t)
+            if j is None:
+                j = self.token_ids[t] = len(self.vocab)
+                self.vocab.append(t)
+            indices.append(j)
+            counts.append(c)
+        return indices, counts
+
+    def _compact(self) -> None:
+        # Tokeny usuniętych/zmienionych wykładów zostają w słowniku jako puste kolumny;
+        # gdy stanowią większość, numerujemy kolumny od nowa.
+        if len(self.vocab) <= 2 * len(self.df):
+            return
+        self.vocab = [t for t in self.vocab if t in self.df]
+        remap = {self.token_ids[t]: i for i, t in enumerate(self.vocab)}
+        self.token_ids = {t: i for i, t in enumerate(self.vocab)}
+        self.rows = {n: ([remap[j] for j in indices], counts) for n, (indices, counts) in self.rows.items()}
+
+    def update(self, test: DocStats, current: dict[str, str], fresh: dict[str, DocStats]) -> None:
+        # `current`: nazwa -> digest wykładów w kolejności raportu; `fresh` musi zawierać pliki ze stale(current).
+        stale = self.stale(current)
+        for n in [n for n in self.docs if n not in current or n in stale]:
+            self._subtract(self.tokens(n))
+            del self.docs[n], self.rows[n]
+            self.coverage.pop(n, None)
+        for n in stale:
+            d = fresh[n]
+            self._add(d.tokens)
+            self.docs[n] = d.digest
+            self.rows[n] = self._row(d.tokens)
+        self._compact()
+
+        if test.digest != self.test_digest:
+            self.test_digest = test.digest
+            self.coverage = {}
+        self.updated = [n for n in current if n not in self.coverage]
+        if self.updated:
+            test_set = coverage_terms(test.tokens)
+            for n in self.updated:
+                self.coverage[n] = compute_coverage(test_set, self.tokens(n))
+
+    def overall_coverage(self, test_tokens: Counter[str]) -> float:
+        # df > 0 <=> token występuje w którymkolwiek wykładzie
+        return compute_coverage(coverage_terms(test_tokens), self.df)
+
+
+def load_question_bank(path: Path) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def question_tokens(question: dict) -> Counter[str]:
+    # Pytanie + wszystkie odpowiedzi + wyjaśnienie – to, czego student musi się nauczyć.
+    parts = [question.get("pytanie", ""), *question.get("odpowiedzi", []), question.get("tlumaczenie", "")]
+    tokens: Counter[str] = Counter()
+    for part in parts:
+        tokens.update(iter_tokens(part))
+    return tokens
+
+
+def score_questions(
+    questions: SparseMatrix, lectures: SparseMatrix, lectures_raw: SparseMatrix
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Jeden wsadowy przebieg dla wszystkich pytań: (najlepszy wykład, podobieństwo %, pokrycie %).
+    sims = questions.cosine(lectures)
+    q_bin = questions.binary()
+    overlap = q_bin.dot_t(lectures_raw.binary())
+    n_unique = np.diff(q_bin.indptr).astype(np.float64)
+    best = np.argmax(sims, axis=1)
+    rows = np.arange(len(best))
+    coverage = np.divide(overlap[rows, best], n_unique, out=np.zeros(len(best)), where=n_unique > 0)
+    return best, sims[rows, best] * 100.0, coverage * 100.0
+
+
+def _short(text: str, limit: int = 70) -> str:
+    line = text.split("```")[0].strip().splitlines()[0] if text.strip() else ""
+    if len(line) > limit:
+        line = line[: limit - 1] + "…"
+    return line.replace("|", "\\|")
+
+
+def question_report(
+    questions: list[dict], lecture_names: list[str], best: np.ndarray, sims: np.ndarray, coverage: np.ndarray
+) -> list[str]:
+    report = ["# Pokrycie pytań z bazy przez wykłady W1–W11\n"]
+    report.append(f"- Pytania: **{len(questions)}**, wykłady: **{len(lecture_names)}**")
+    uncovered = int(np.count_nonzero(sims == 0))
+    report.append(f"- Pytania bez żadnego wspólnego słowa z wykładami: **{uncovered}**\n")
+
+    report.append("## Liczba pytań per wykład (najlepsze dopasowanie)\n")
+    counts = np.bincount(best[sims > 0], minlength=len(lecture_names))
+    for i in np.argsort(-counts, kind="stable"):
+        report.append(f"- {lecture_names[i]}: {counts[i]}")
+    report.append("")
+
+    report.append("## Pytanie → najlepszy wykład\n")
+    report.append("| ID | Typ | Pytanie | Wykład | Podobieństwo | Pokrycie słów |")
+    report.append("|---:|---|---|---|---:|---:|")
+    # najpierw najsłabiej pokryte – to one wymagają uwagi
+    for i in np.lexsort((-sims, coverage)):
+        q = questions[i]
+        lecture = lecture_names[best[i]] if sims[i] > 0 else "—"
+        report.append(
+            f"| {q.get('id', i + 1)} | {q.get('typ', '')} | {_short(q.get('pytanie', ''))} | {lecture} "
+            f"| {sims[i]:.1f}% | {coverage[i]:.1f}% |"
+        )
+    report.append("")
+    return report
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pokrycie test_python.pdf przez wykłady W1..W11.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="liczba procesów do ekstrakcji PDF (1 = sekwencyjnie)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="nie czytaj ani nie zapisuj cache (.pdf_cache)")
+    parser.add_argument("--rebuild-cache", action="store_true", help="wyczyść cache i zbuduj go od nowa")
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=CACHE_MAX_BYTES // (1024 * 1024),
+        help="limit rozmiaru cache w MB (najdawniej używane wpisy są usuwane)",
+    )
+    parser.add_argument(
+        "--weighting",
+        choices=sorted(WEIGHTINGS),
+        default="raw",
+        help="ważenie tokenów w podobieństwie kosinusowym (raw, tfidf, bm25); tfidf/bm25 ustala też ranking wykładów",
+    )
+    parser.add_argument(
+        "--questions",
+        nargs="?",
+        type=Path,
+        const=QUESTIONS_FILE,
+        default=None,
+        help="dodatkowo dopasuj każde pytanie z bazy JSON do wykładów (domyślnie test_python_baza_pytan.json)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     pdfs = sorted(WORKSPACE.glob("W[0-9].pdf")) + sorted(WORKSPACE.glob("W[0-9][0-9].pdf"))
     pdfs = [p for p in pdfs if p.is_file()]
     test_pdf = WORKSPACE / "test_python.pdf"
@@ -197,57 +791,108 @@ def main() -> None:
     if not pdfs:
         raise SystemExit("Nie znaleziono PDF-ów W1..W11 w katalogu głównym.")
 
-    # Ekstrakcja
-    test_text = extract_pdf_text(test_pdf)
-    test_stats = DocStats(
-        name=test_pdf.name,
-        text_len=len(test_text),
-        tokens=Counter(tokenize(test_text)),
-    )
-
-    lecture_docs: list[DocStats] = []
-    lecture_all = Counter()
-    for p in pdfs:
-        txt = extract_pdf_text(p)
-        c = Counter(tokenize(txt))
-        lecture_docs.append(DocStats(name=p.name, text_len=len(txt), tokens=c))
-        lecture_all.update(c)
-
-    # Metryki
-    overall_cov = compute_coverage(test_stats.tokens, lecture_all)
-    overall_cos = cosine_similarity(test_stats.tokens, lecture_all) * 100.0
-
-    # Braki (top z testu, których nie ma w wykładach)
-    lecture_vocab = set(lecture_all.keys())
-    missing = [(t, c) for (t, c) in test_stats.tokens.items() if t not in lecture_vocab and len(t) >= 3]
+    # Ekstrakcja (z cache, o ile nie wyłączony)
+    cache = None
+    if not args.no_cache:
+        cache = TextCache(max_bytes=args.cache_max_mb * 1024 * 1024)
+        if args.rebuild_cache:
+            cache.clear()
+
+    # Skróty plików: pełny SHA-256 tylko dla PDF-ów ze zmienionym rozmiarem lub mtime
+    paths = [test_pdf, *pdfs]
+    digests = cache.digests(paths) if cache is not None else {p: file_digest(p) for p in paths}
+    current = {p.name: digests[p] for p in pdfs}
+    lecture_names = list(current)
+
+    # Stan korpusu (słownik, wiersze CSR, pokrycie) i indeks odwrócony – przyrostowo względem poprzedniego
+    # uruchomienia; wczytujemy tylko test i wykłady dodane/zmienione od tamtej pory
+    state = CoverageState.load(cache.state_path) if cache is not None else CoverageState()
+    index = InvertedIndex.load(cache.index_path) if cache is not None else InvertedIndex()
+    stale = set(state.stale(current)) | set(index.stale(current))
+    to_load = [test_pdf, *(p for p in pdfs if p.name in stale)]
+    test_stats, *fresh = load_documents(to_load, workers=args.workers, cache=cache, digests=digests)
+    fresh_docs = {d.name: d for d in fresh}
+    state.update(test_stats, current, fresh_docs)
+    index_changed = index.update(current, fresh_docs)
+    if cache is not None:
+        if fresh or state.updated:
+            state.save(cache.state_path)
+        if index_changed:
+            index.save(cache.index_path)
+    lecture_all = state.lecture_all
+
+    bank: list[dict] = []
+    bank_tokens: list[Counter[str]] = []
+    if args.questions is not None:
+        bank = load_question_bank(args.questions)
+        bank_tokens = [question_tokens(q) for q in bank]
+
+    # Metryki: wszystkie podobieństwa w jednym przebiegu na macierzach CSR
+    vocab = build_vocabulary([test_stats.tokens, *bank_tokens], state.token_ids)
+    lectures_raw = state.matrix(lecture_names, len(vocab))
+    queries = SparseMatrix.from_counters([test_stats.tokens, lecture_all], vocab)
+    df_index = DocumentFrequencyIndex.from_matrix(lectures_raw)
+    lectures = df_index.apply(lectures_raw, args.weighting)
+    queries = df_index.apply(queries, args.weighting)
+    test_vs_lectures = lectures.cosine(queries)[:, 0] * 100.0
+    lecture_vs_lecture = lectures.cosine(lectures) * 100.0
+
+    overall_cov = state.overall_coverage(test_stats.tokens)
+    overall_cos = queries.cosine(queries)[0, 1] * 100.0
+
+    # Braki (top z testu, których nie ma w wykładach) – sprawdzane w indeksie odwróconym
+    missing = [(t, c) for (t, c) in test_stats.tokens.items() if t not in index and len(t) >= 3]
     missing.sort(key=lambda x: (-x[1], x[0]))
 
     per_doc = []
-    for d in lecture_docs:
-        cov = compute_coverage(test_stats.tokens, d.tokens)
-        cos = cosine_similarity(test_stats.tokens, d.tokens) * 100.0
-        per_doc.append((d.name, cov, cos, sum(d.tokens.values())))
-    per_doc.sort(key=lambda x: (-x[1], -x[2], x[0]))
+    for name, cos in zip(lecture_names, test_vs_lectures):
+        per_doc.append((name, state.coverage[name], float(cos), state.n_tokens(name)))
+    if args.weighting == "raw":
+        per_doc.sort(key=lambda x: (-x[1], -x[2], x[0]))
+    else:
+        # Ważone podobieństwo decyduje o kolejności – pokrycie surowymi tokenami faworyzuje długie prezentacje
+        per_doc.sort(key=lambda x: (-x[2], -x[1], x[0]))
+
+    # Pary wykładów o najbardziej zbliżonej treści (powtórzenia materiału)
+    rows, cols = np.triu_indices(len(lecture_names), k=1)
+    pair_order = np.argsort(-lecture_vs_lecture[rows, cols], kind="stable")[:10]
+    similar_pairs = [
+        (lecture_names[rows[i]], lecture_names[cols[i]], float(lecture_vs_lecture[rows[i], cols[i]]))
+        for i in pair_order
+    ]
 
     # Raport
     report = []
     report.append("# Raport pokrycia: W1–W11 vs test_python.pdf\n")
     report.append(f"- Test: **{test_stats.name}** (znaki: {test_stats.text_len:,}, tokeny: {sum(test_stats.tokens.values()):,})")
-    report.append(f"- Wykłady: **{len(lecture_docs)} plików** (tokeny łącznie: {sum(lecture_all.values()):,})\n")
+    report.append(f"- Wykłady: **{len(lecture_names)} plików** (tokeny łącznie: {sum(lecture_all.values()):,})\n")
     report.append("## Wynik globalny\n")
     report.append(f"- Pokrycie słów-kluczy testu przez wykłady: **{overall_cov:.1f}%**")
-    report.append(f"- Podobieństwo kosinusowe (częstości tokenów): **{overall_cos:.1f}%**\n")
+    report.append(f"- Podobieństwo kosinusowe ({WEIGHTINGS[args.weighting]}): **{overall_cos:.1f}%**\n")
 
-    report.append("## Najlepiej pokrywające wykłady (ranking)\n")
+    if args.weighting == "raw":
+        report.append("## Najlepiej pokrywające wykłady (ranking)\n")
+    else:
+        report.append(f"## Najlepiej pokrywające wykłady (ranking wg podobieństwa {WEIGHTINGS[args.weighting]})\n")
     report.append("| PDF | Pokrycie | Podobieństwo | Liczba tokenów |")
     report.append("|---|---:|---:|---:|")
     for name, cov, cos, tok in per_doc:
         report.append(f"| {name} | {cov:.1f}% | {cos:.1f}% | {tok:,} |")
     report.append("")
 
+    if similar_pairs:
+        report.append("## Najbardziej podobne pary wykładów\n")
+        report.append("| PDF | PDF | Podobieństwo |")
+        report.append("|---|---|---:|")
+        for a, b, cos in similar_pairs:
+            report.append(f"| {a} | {b} | {cos:.1f}% |")
+        report.append("")
+
     report.append("## Top słowa-klucze w teście\n")
     for t, c in top_keywords(test_stats.tokens, k=50):
-        report.append(f"- {t} ({c})")
+        refs = index.lookup(t)
+        where = f" — {format_locations(refs)}" if refs else " — brak w wykładach"
+        report.append(f"- {t} ({c}){where}")
     report.append("")
 
     report.append("## Top braki (częste w teście, niewystępujące w W1–W11)\n")
@@ -257,9 +902,19 @@ def main() -> None:
 
     out_path = WORKSPACE / "RAPORT_POKRYCIA_W1_W11_vs_test.md"
     out_path.write_text("\n".join(report), encoding="utf-8")
-    print(f"Zapisano: {out_path}")
+    print(
+        f"Zapisano: {out_path} (wczytane PDF-y: {len(fresh)}/{len(lecture_names)}, "
+        f"przeliczone pokrycie: {len(state.updated)}/{len(lecture_names)} wykładów)"
+    )
     print(f"Pokrycie (keywords): {overall_cov:.1f}% | Podobieństwo (cosine): {overall_cos:.1f}%")
 
+    if bank:
+        questions = df_index.apply(SparseMatrix.from_counters(bank_tokens, vocab), args.weighting)
+        best, sims, coverage = score_questions(questions, lectures, lectures_raw)
+        q_path = WORKSPACE / "RAPORT_POKRYCIA_PYTAN_vs_W1_W11.md"
+        q_path.write_text("\n".join(question_report(bank, lecture_names, best, sims, coverage)), encoding="utf-8")
+        print(f"Zapisano: {q_path} (pytań: {len(bank)})")
+
 
 if __name__ == "__main__":
     main()
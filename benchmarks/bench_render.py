@@ -0,0 +1,81 @@
+"""
+Benchmark opóźnienia renderowania pytania w GUI (ms na pytanie).
+
+Uruchamia TestPythonGUI, startuje test ze wszystkimi pytaniami i dla każdego
+pytania mierzy show_question() + submit_answer() łącznie z przetworzeniem
+zdarzeń Tk (root.update()), czyli czas do narysowania. Czas show_question
+jest dodatkowo rozbity przez render_hook na aktualizację treści ('content')
+i przeliczenie geometrii/scrollowania ('layout'). Wymaga ekranu
+(na serwerze np. pod xvfb-run). Porównanie przed/po: uruchomić na obu commitach.
+
+    python benchmarks/bench_render.py [--rounds 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from tkinter import Tk, messagebox
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import test_python_gui as gui  # noqa: E402
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3, help="ile razy przejść przez całą bazę pytań")
+    args = parser.parse_args(argv)
+
+    # bez okien dialogowych w trakcie pomiaru
+    messagebox.showwarning = messagebox.showinfo = lambda *a, **k: None
+
+    root = Tk()
+    app = gui.TestPythonGUI(root)
+    root.update()
+
+    show_ms: list[float] = []
+    submit_ms: list[float] = []
+    phases: dict[str, list[float]] = {"content": [], "layout": []}
+    app.render_hook = lambda phase, seconds: phases[phase].append(seconds * 1000)
+    for _ in range(args.rounds):
+        app.start_test_all()
+        root.update()
+        while not app.session.done:
+            start = time.perf_counter()
+            app.show_question()
+            root.update()
+            show_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            app.answer_var.set("0")
+            app.submit_answer()
+            root.update()
+            submit_ms.append((time.perf_counter() - start) * 1000)
+        app.reset_test()
+    root.destroy()
+
+    print(f"Pytań: {len(show_ms)} ({args.rounds} przebiegi)")
+    for label, values in (
+        ("show_question", show_ms),
+        ("  treść", phases["content"]),
+        ("  geometria", phases["layout"]),
+        ("submit_answer", submit_ms),
+    ):
+        print(
+            f"{label:<14} średnio {statistics.mean(values):7.2f} ms   mediana {statistics.median(values):7.2f} ms"
+            f"   p95 {percentile(values, 95):7.2f} ms   max {max(values):7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
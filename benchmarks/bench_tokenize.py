@@ -0,0 +1,85 @@
+"""
+Mikro-benchmark tokenizera z analyze_pdfs_coverage.py (tokeny/s).
+
+Porównuje obecny tokenizer (jeden replace + lower + findall z minimalną
+długością w regexie + filterfalse) z poprzednią implementacją (trzy
+str.replace + re.sub + pętla w Pythonie) na stronach test_python.pdf.
+
+    python benchmarks/bench_tokenize.py [--repeat 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import analyze_pdfs_coverage as apc  # noqa: E402
+
+
+LEGACY_TOKEN_RE = re.compile(r"[A-Za-zĄĆĘŁŃÓŚŹŻąćęłńóśźż_]{2,}")
+
+
+def legacy_normalize_text(s: str) -> str:
+    s = s.replace("\u00ad", "")
+    s = s.replace("\u2013", "-").replace("\u2014", "-")
+    s = re.sub(r"[ \t]+", " ", s)
+    return s
+
+
+def legacy_tokenize(s: str) -> list[str]:
+    s = legacy_normalize_text(s).lower()
+    tokens = LEGACY_TOKEN_RE.findall(s)
+    out: list[str] = []
+    for t in tokens:
+        if t in apc.STOPWORDS:
+            continue
+        if len(t) <= 2:
+            continue
+        out.append(t)
+    return out
+
+
+def measure(tokenize, pages: list[str], repeat: int) -> tuple[float, int]:
+    n_tokens = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            n_tokens += len(tokenize(page))
+    return time.perf_counter() - start, n_tokens
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf", type=Path, default=ROOT / "test_python.pdf")
+    parser.add_argument("--repeat", type=int, default=200, help="ile razy tokenizować wszystkie strony")
+    args = parser.parse_args(argv)
+
+    pages = [txt for _, txt in apc.iter_pdf_pages(args.pdf)]
+    for page in pages:
+        if Counter(legacy_tokenize(page)) != Counter(apc.tokenize(page)):
+            raise SystemExit("Różne wyniki tokenizacji – benchmark nieważny.")
+
+    print(f"{args.pdf.name}: {len(pages)} stron, {sum(map(len, pages)):,} znaków, powtórzeń: {args.repeat}")
+    # strona po stronie (jak w analizatorze) oraz jeden duży tekst (koszt bez narzutu wywołań)
+    for label, inputs, repeat in (
+        ("strony", pages, args.repeat),
+        ("cały tekst x50", ["\n".join(pages) * 50], max(1, args.repeat // 50)),
+    ):
+        print(f"[{label}]")
+        results = {}
+        for name, fn in (("poprzedni", legacy_tokenize), ("obecny", apc.tokenize)):
+            elapsed, n_tokens = measure(fn, inputs, repeat)
+            results[name] = n_tokens / elapsed
+            print(f"  {name:<10} {elapsed:8.3f} s  {results[name]:>14,.0f} tokenów/s")
+        print(f"  przyspieszenie: {results['obecny'] / results['poprzedni']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Test obciążeniowy serwera quiz_server.py (żądania/s i opóźnienia).
+
+Uruchamia serwer w osobnym procesie (albo łączy się z --url) i symuluje
+--clients uczniów naraz: każdy na własnym połączeniu keep-alive zaczyna
+test, odpowiada na wszystkie pytania i go kończy, w pętli przez --duration s.
+
+    python benchmarks/load_test_server.py [--clients 300] [--duration 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class Client:
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, body: dict | None = None) -> tuple[int, dict]:
+        data = json.dumps(body).encode() if body is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+        )
+        status_line = await self.reader.readline()
+        length = 0
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        payload = json.loads(await self.reader.readexactly(length))
+        return int(status_line.split()[1]), payload
+
+
+async def student(client: Client, deadline: float, rng: random.Random, latencies: list[float], stats: dict) -> None:
+    await client.connect()
+
+    async def call(method: str, path: str, body: dict | None = None) -> dict:
+        start = time.perf_counter()
+        status, payload = await client.request(method, path, body)
+        latencies.append(time.perf_counter() - start)
+        if status >= 400:
+            stats["errors"] += 1
+        return payload
+
+    while time.perf_counter() < deadline:
+        started = await call("POST", "/sessions", {"count": 20})
+        session, question = started["session"], started["question"]
+        while question is not None:
+            answer = await call("POST", f"/sessions/{session}/answer", {"choice": rng.randrange(len(question["answers"]))})
+            question = answer["question"]
+        await call("POST", f"/sessions/{session}/finish")
+        stats["sessions"] += 1
+    client.writer.close()
+
+
+async def run_load(host: str, port: int, clients: int, duration: float, seed: int) -> None:
+    latencies: list[float] = []
+    stats = {"sessions": 0, "errors": 0}
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        student(Client(host, port), deadline, random.Random(seed + i), latencies, stats) for i in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000  # noqa: E731
+    print(f"Klientów: {clients}, czas: {elapsed:.1f} s")
+    print(f"Żądań: {len(latencies):,} ({len(latencies) / elapsed:,.0f}/s), zakończonych testów: {stats['sessions']:,}, błędów: {stats['errors']}")
+    print(f"Opóźnienie: p50 {pct(50):.2f} ms   p95 {pct(95):.2f} ms   p99 {pct(99):.2f} ms   max {latencies[-1] * 1000:.2f} ms")
+
+    client = Client(host, port)
+    await client.connect()
+    _, metrics = await client.request("GET", "/metrics")
+    client.writer.close()
+    history = metrics.get("history")
+    if history:
+        print(
+            f"Zapis historii: {history['written']:,} wyników w {history['batches']:,} paczkach, "
+            f"kolejka {history['queue_depth']}, zapis paczki śr. {history['flush_ms_avg']:.2f} ms, "
+            f"maks. {history['flush_ms_max']:.2f} ms, błędów {history['errors']}"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="adres działającego serwera (domyślnie: uruchom lokalny)")
+    parser.add_argument("--clients", type=int, default=300, help="liczba jednoczesnych sesji")
+    parser.add_argument("--duration", type=float, default=10.0, help="czas testu w sekundach")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    if args.url:
+        url = urlsplit(args.url)
+        asyncio.run(run_load(url.hostname, url.port or 80, args.clients, args.duration, args.seed))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = subprocess.Popen(
+            [sys.executable, str(ROOT / "quiz_server.py"), "--port", "0", "--history", str(Path(tmp) / "historia.jsonl")],
+            stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            # "Serwer testu działa na http://host:port"
+            url = urlsplit(server.stdout.readline().split()[-1])
+            asyncio.run(run_load(url.hostname, url.port, args.clients, args.duration, args.seed))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Benchmarki gorących ścieżek analizatora pokrycia i programu testowego.
+
+Generuje syntetyczne dane o zadanym rozmiarze (PDF-y wykładów, baza pytań,
+historia testów), mierzy czas (najlepszy z --repeat) i szczytową pamięć
+(tracemalloc) każdej operacji, a wynik może zapisać do JSON i porównać
+z wynikiem z innego commita:
+
+    python benchmarks/run_benchmarks.py --save przed.json
+    git checkout <inny-commit>
+    python benchmarks/run_benchmarks.py --compare przed.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import analyze_pdfs_coverage as apc  # noqa: E402
+import quiz_analytics  # noqa: E402
+import test_python_gui as gui  # noqa: E402
+from quiz_adaptive import AdaptiveSelector  # noqa: E402
+from quiz_engine import QuizEngine  # noqa: E402
+from quiz_search import SearchIndex, theory_sections  # noqa: E402
+from quiz_storage import SqliteStore  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# Dane syntetyczne
+# ---------------------------------------------------------------------------
+
+def make_vocabulary(rng: random.Random, size: int) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(letters, k=rng.randint(3, 10))))
+    return sorted(words)
+
+
+def make_page_lines(rng: random.Random, vocab: list[str], *, lines: int = 40, words_per_line: int = 12) -> list[str]:
+    # Rozkład Zipfa – kilka słów bardzo częstych, długi ogon rzadkich.
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    return [" ".join(rng.choices(vocab, weights, k=words_per_line)) for _ in range(lines)]
+
+
+def write_pdf(path: Path, pages: list[list[str]]) -> None:
+    # Minimalny PDF z tekstem (Helvetica, ASCII) – wystarczy dla PdfReader.extract_text().
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # /Pages – uzupełniane niżej
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        content = ["BT /F1 10 Tf 12 TL 40 800 Td"]
+        content += [f"({line}) '" for line in lines]
+        content.append("ET")
+        stream = "\n".join(content).encode("ascii")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode("ascii")
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def make_question_bank(rng: random.Random, vocab: list[str], n: int) -> list[dict]:
+    questions = []
+    for i in range(1, n + 1):
+        questions.append({
+            "id": i,
+            "typ": rng.choice(["teoria", "kod"]),
+            "pytanie": " ".join(rng.choices(vocab, k=15)) + "?",
+            "odpowiedzi": [" ".join(rng.choices(vocab, k=4)) for _ in range(4)],
+            "prawidlowa": rng.randrange(4),
+            "tlumaczenie": " ".join(rng.choices(vocab, k=25)),
+        })
+    return questions
+
+
+def make_history(rng: random.Random, n_attempts: int, n_questions: int, *, per_test: int = 20) -> list[dict]:
+    history = []
+    for i in range(n_attempts):
+        answers = []
+        for qid in rng.sample(range(1, n_questions + 1), min(per_test, n_questions)):
+            user = rng.randrange(4)
+            correct = rng.randrange(4)
+            answers.append({
+                "question_id": qid,
+                "user_answer": user,
+                "correct_answer": correct,
+                "is_correct": user == correct,
+            })
+        n_correct = sum(a["is_correct"] for a in answers)
+        history.append({
+            "date": f"2026-01-{1 + i % 28:02d}T12:{i % 60:02d}:00",
+            "duration_seconds": rng.randint(60, 1800),
+            "total": len(answers),
+            "correct": n_correct,
+            "percentage": round(100.0 * n_correct / len(answers), 1),
+            "answers": answers,
+        })
+    return history
+
+
+# ---------------------------------------------------------------------------
+# Pomiar
+# ---------------------------------------------------------------------------
+
+def measure(fn: Callable[[], object], repeat: int) -> dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    # osobny przebieg pod tracemalloc, żeby narzut śledzenia nie fałszował czasu
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(times), "peak_bytes": peak}
+
+
+def run(args: argparse.Namespace, workdir: Path) -> dict[str, dict[str, float]]:
+    rng = random.Random(args.seed)
+    vocab = make_vocabulary(rng, args.vocab)
+
+    pdf_paths = []
+    for i in range(1, args.pdfs + 1):
+        path = workdir / f"W{i}.pdf"
+        write_pdf(path, [make_page_lines(rng, vocab) for _ in range(args.pages)])
+        pdf_paths.append(path)
+    page_text = "\n".join(make_page_lines(rng, vocab)) * args.pages
+
+    questions = make_question_bank(rng, vocab, args.questions)
+    questions_file = workdir / "baza_pytan.json"
+    questions_file.write_text(json.dumps(questions, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    app = gui.TestPythonGUI.__new__(gui.TestPythonGUI)  # bez Tk – tylko metody I/O
+    app.storage = "json"
+    app.db = None
+    app.questions_file = questions_file
+    app.history_file = workdir / "historia.jsonl"
+    app.legacy_history_file = workdir / "historia.json"
+    history = make_history(rng, args.attempts, args.questions)
+    app.legacy_history_file.write_text(json.dumps(history[::-1], ensure_ascii=False), encoding="utf-8")
+    app.history_store = app.load_history()  # migracja do JSONL
+    new_record = history[-1]
+
+    db = SqliteStore(workdir / "test_python.db")
+    db.import_questions(questions_file)
+    db.import_history(app.history_store)
+
+    engine = QuizEngine(app.load_questions(), rng=random.Random(args.seed))
+
+    def engine_session() -> None:
+        # pełny test bez GUI: start, 20 odpowiedzi, wynik (bez zapisu)
+        session = engine.start()
+        while (current := engine.question(session)) is not None:
+            engine.answer(session, engine.rng.randrange(len(current[1].answers)))
+        engine.finish(session)
+
+    selector = AdaptiveSelector.from_history(engine.question_ids, history)
+
+    columns = quiz_analytics.HistoryColumns.from_records(history)
+    topic_of = {q: f"temat{q % 18}" for q in engine.question_ids}
+
+    bank_questions = engine.bank.get_questions(engine.question_ids)
+    sections = theory_sections((ROOT / "SCIAGA_PYTHON.md").read_text(encoding="utf-8"))
+    search_index = SearchIndex.build(bank_questions, sections, "bench")
+    search_cache = workdir / "search_cache.json"
+    search_index.save(search_cache)
+    search_words = rng.sample(vocab, 50)
+
+    def search_typing() -> None:
+        # zapytanie z dwóch słów wpisywane litera po literze (bez cache zapytań)
+        search_index._cache.clear()
+        search_index._last = None
+        for first, second in zip(search_words[::2], search_words[1::2]):
+            query = f"{first} {second}"
+            for i in range(1, len(query) + 1):
+                search_index.search(query[:i], 20)
+
+    def sqlite_startup() -> None:
+        ids = db.question_ids()
+        db.get_questions(rng.sample(ids, 20))
+        db.recent(20)
+
+    counters = [Counter(apc.tokenize(apc.extract_pdf_text(p))) for p in pdf_paths]
+    test_counter = Counter(apc.tokenize(page_text))
+    lecture_all = sum(counters, Counter())
+
+    def all_pairs_matrix() -> None:
+        vocab_index = apc.build_vocabulary([test_counter, lecture_all])
+        m = apc.SparseMatrix.from_counters(counters, vocab_index)
+        q = apc.SparseMatrix.from_counters([test_counter], vocab_index)
+        m.cosine(q)
+        m.cosine(m)
+
+    benchmarks: dict[str, Callable[[], object]] = {
+        "extract_pdf_text": lambda: [apc.extract_pdf_text(p) for p in pdf_paths],
+        "tokenize": lambda: apc.tokenize(page_text),
+        "cosine_similarity": lambda: [apc.cosine_similarity(test_counter, c) for c in counters],
+        "sparse_cosine_all_pairs": all_pairs_matrix,
+        "compute_coverage": lambda: [apc.compute_coverage(test_counter, c) for c in counters],
+        "load_questions": app.load_questions,
+        "load_history": lambda: app.history_store.recent(20),
+        "load_history_page_50": lambda: app.history_store.recent(gui.HISTORY_PAGE_SIZE + 1, offset=50 * gui.HISTORY_PAGE_SIZE),
+        "save_history": lambda: app.save_history(new_record),
+        "engine_session": engine_session,
+        "adaptive_build": lambda: AdaptiveSelector.from_history(engine.question_ids, history),
+        "adaptive_sample": lambda: selector.sample(20, engine.rng),
+        "adaptive_record": lambda: selector.record(new_record),
+        "analytics_load": lambda: quiz_analytics.HistoryColumns.from_records(history),
+        "analytics_summary": lambda: quiz_analytics.summary(columns, topic_of),
+        "search_build": lambda: SearchIndex.build(bank_questions, sections, "bench"),
+        "search_load_cache": lambda: SearchIndex.load(search_cache, "bench"),
+        "search_typing_25_queries": search_typing,
+        "sqlite_startup": sqlite_startup,
+        "sqlite_question_stats": lambda: db.question_stats(rng.randint(1, args.questions)),
+        "sqlite_save_history": lambda: db.append(new_record),
+    }
+
+    results = {}
+    for name, fn in benchmarks.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = measure(fn, args.repeat)
+        r = results[name]
+        print(f"{name:<26} {r['seconds'] * 1000:10.2f} ms   peak {r['peak_bytes'] / 1024 / 1024:8.2f} MB", flush=True)
+    return results
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or "?"
+    except OSError:
+        return "?"
+
+
+def compare(results: dict[str, dict[str, float]], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"\nPorównanie z {baseline_path.name} (commit {baseline.get('revision', '?')}):")
+    for name, r in results.items():
+        old = baseline["results"].get(name)
+        if not old:
+            print(f"{name:<26} brak w wyniku bazowym")
+            continue
+        ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        mem = r["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else float("inf")
+        print(f"{name:<26} czas x{ratio:6.2f}   pamięć x{mem:6.2f}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarki analizatora pokrycia i programu testowego.")
+    parser.add_argument("--pdfs", type=int, default=10, help="liczba syntetycznych PDF-ów wykładów")
+    parser.add_argument("--pages", type=int, default=20, help="stron na PDF")
+    parser.add_argument("--vocab", type=int, default=5000, help="rozmiar słownika syntetycznego")
+    parser.add_argument("--questions", type=int, default=10_000, help="liczba pytań w bazie")
+    parser.add_argument("--attempts", type=int, default=100_000, help="liczba testów w historii")
+    parser.add_argument("--repeat", type=int, default=3, help="powtórzeń na pomiar (liczy się najlepszy)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--only", nargs="*", help="uruchom tylko wybrane benchmarki")
+    parser.add_argument("--save", type=Path, help="zapisz wyniki do pliku JSON")
+    parser.add_argument("--compare", type=Path, help="porównaj z wcześniej zapisanym JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args, Path(tmp))
+
+    if args.save:
+        payload = {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("save", "compare")},
+            "results": results,
+        }
+        args.save.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"Zapisano: {args.save}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Adaptacyjny dobór pytań na podstawie historii odpowiedzi
+
+Każde pytanie ma wagę = wygładzony odsetek błędnych odpowiedzi, obniżoną,
+jeśli pytanie było w jednym z ostatnich testów (powtórki w odstępach).
+Wagi trzymane są w drzewie Fenwicka: po teście aktualizowane są tylko
+pytania, których on dotyczył, a losowanie k pytań bez powtórzeń kosztuje
+O(k log n) - bez ponownego przeglądania całej historii.
+"""
+
+import random
+from collections import deque
+
+# Ile ostatnich testów "chłodzi" pytanie i jak bardzo obniża to jego wagę
+COOLDOWN_TESTS = 3
+COOLDOWN_FACTOR = 0.2
+
+
+class FenwickTree:
+    """Drzewo Fenwicka (BIT) nad wagami: zmiana wagi i szukanie po sumie prefiksowej w O(log n)"""
+
+    def __init__(self, weights):
+        n = len(weights)
+        self.n = n
+        self.weights = list(weights)
+        tree = [0.0] + self.weights
+        # budowa w O(n)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self.tree = tree
+        self.top = 1 << n.bit_length() if n else 0
+
+    def total(self):
+        total = 0.0
+        i = self.n
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def set(self, index, weight):
+        """Ustaw wagę elementu `index` (od 0)"""
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        i = index + 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, target):
+        """Najmniejszy indeks, dla którego suma wag do niego włącznie przekracza `target`"""
+        pos = 0
+        step = self.top
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return min(pos, self.n - 1)
+
+
+class AdaptiveSelector:
+    """Statystyki pytań (liczba odpowiedzi, błędy, ostatnie wystąpienie) i ważone losowanie"""
+
+    def __init__(self, question_ids):
+        self.ids = list(question_ids)
+        self.position = {qid: i for i, qid in enumerate(self.ids)}
+        n = len(self.ids)
+        self.attempts = [0] * n
+        self.wrong = [0] * n
+        self.last_seen = [None] * n  # data testu (ISO), w którym pytanie było ostatnio
+        self.cooldown = [0] * n  # w ilu z ostatnich COOLDOWN_TESTS testów było pytanie
+        self.recent_tests = deque()
+        self.tree = FenwickTree([self.weight(i) for i in range(n)])
+
+    @classmethod
+    def from_history(cls, question_ids, history):
+        """Zbuduj statystyki jednym przejściem po historii (od najstarszego testu)"""
+        selector = cls(question_ids)
+        for record in history:
+            selector.record(record, update_tree=False)
+        selector.tree = FenwickTree([selector.weight(i) for i in range(len(selector.ids))])
+        return selector
+
+    def weight(self, i):
+        # wygładzenie Laplace'a: pytanie bez odpowiedzi ma wagę 0.5
+        w = (self.wrong[i] + 1) / (self.attempts[i] + 2)
+        return w * COOLDOWN_FACTOR if self.cooldown[i] else w
+
+    def error_rate(self, question_id):
+        i = self.position[question_id]
+        return self.wrong[i] / self.attempts[i] if self.attempts[i] else None
+
+    def record(self, record, update_tree=True):
+        """Uwzględnij zakończony test (rekord historii z listą 'answers')"""
+        touched = set()
+        for answer in record.get('answers', ()):
+            i = self.position.get(answer['question_id'])
+            if i is None:
+                continue  # pytania już nie ma w bazie
+            self.attempts[i] += 1
+            if not answer['is_correct']:
+                self.wrong[i] += 1
+            self.last_seen[i] = record.get('date')
+            touched.add(i)
+
+        for i in touched:
+            self.cooldown[i] += 1
+        self.recent_tests.append(touched)
+        if len(self.recent_tests) > COOLDOWN_TESTS:
+            expired = self.recent_tests.popleft()
+            for i in expired:
+                self.cooldown[i] -= 1
+            touched = touched | expired  # nowy zbiór - `touched` jest już w recent_tests
+
+        if update_tree:
+            for i in touched:
+                self.tree.set(i, self.weight(i))
+
+    def sample(self, k, rng=random):
+        """k różnych id pytań, losowanych proporcjonalnie do wag - O(k log n)"""
+        k = min(k, len(self.ids))
+        chosen = []
+        removed = []
+        try:
+            while len(chosen) < k:
+                total = self.tree.total()
+                if total <= 0:
+                    break
+                i = self.tree.find(rng.random() * total)
+                if self.tree.weights[i] <= 0:
+                    continue  # błąd zaokrąglenia trafił w już wybrany element
+                chosen.append(self.ids[i])
+                removed.append((i, self.tree.weights[i]))
+                self.tree.set(i, 0.0)  # bez powtórzeń
+        finally:
+            for i, w in removed:
+                self.tree.set(i, w)
+        return chosen
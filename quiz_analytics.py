@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Statystyki z historii testów (NumPy)
+
+Historia jest wczytywana raz do kolumn: tabela testów (data, czas, wynik)
+i tabela odpowiedzi (numer testu, id pytania, poprawność). Wszystkie
+agregaty to wektorowe przejścia po kolumnach (bincount, cumsum) - bez pętli
+po testach w Pythonie, więc wystarczają na setki tysięcy testów.
+"""
+
+from array import array
+
+import numpy as np
+
+
+class HistoryColumns:
+    """Historia testów w kolumnach NumPy"""
+
+    def __init__(self):
+        # testy
+        self.date = np.empty(0, dtype='datetime64[s]')
+        self.duration = np.empty(0, dtype=np.int32)
+        self.total = np.empty(0, dtype=np.int32)
+        self.correct = np.empty(0, dtype=np.int32)
+        self.percentage = np.empty(0, dtype=np.float32)
+        # odpowiedzi
+        self.answer_test = np.empty(0, dtype=np.int32)
+        self.question_id = np.empty(0, dtype=np.int32)
+        self.is_correct = np.empty(0, dtype=bool)
+
+    @classmethod
+    def from_records(cls, records):
+        """Kolumny z rekordów historii (HistoryStore, SqliteStore, lista słowników)"""
+        columns = cls()
+        columns.extend(records)
+        return columns
+
+    @classmethod
+    def from_sqlite(cls, store):
+        """Kolumny prosto z SqliteStore - zapytania po kolumnach, bez budowania słowników"""
+        columns = cls()
+        rows = store.conn.execute(
+            'SELECT id, date, duration_seconds, total, correct, percentage FROM attempts ORDER BY date, id'
+        ).fetchall()
+        if not rows:
+            return columns
+        attempt_id, date, duration, total, correct, percentage = zip(*rows)
+        columns.date = np.array(date, dtype='datetime64[s]')
+        columns.duration = np.array(duration, dtype=np.int32)
+        columns.total = np.array(total, dtype=np.int32)
+        columns.correct = np.array(correct, dtype=np.int32)
+        columns.percentage = np.array(percentage, dtype=np.float32)
+
+        answers = store.conn.execute('SELECT attempt_id, question_id, is_correct FROM answers').fetchall()
+        if answers:
+            a = np.array(answers, dtype=np.int64)
+            # id testu w bazie -> numer wiersza w kolumnach testów
+            row_of = np.full(max(attempt_id) + 1, -1, dtype=np.int32)
+            row_of[np.array(attempt_id)] = np.arange(len(attempt_id), dtype=np.int32)
+            columns.answer_test = row_of[a[:, 0]]
+            columns.question_id = a[:, 1].astype(np.int32)
+            columns.is_correct = a[:, 2].astype(bool)
+        return columns
+
+    def __len__(self):
+        return len(self.total)
+
+    def extend(self, records):
+        """Dopisz testy (np. właśnie zakończony) - jedno przejście, potem doklejenie kolumn"""
+        dates = []
+        duration, total, correct = array('i'), array('i'), array('i')
+        percentage = array('f')
+        answer_test, question_id, is_correct = array('i'), array('i'), array('b')
+        first = len(self)
+        for n, r in enumerate(records, first):
+            dates.append(r['date'])
+            duration.append(r['duration_seconds'])
+            total.append(r['total'])
+            correct.append(r['correct'])
+            percentage.append(r['percentage'])
+            for a in r.get('answers', ()):
+                answer_test.append(n)
+                question_id.append(a['question_id'])
+                is_correct.append(bool(a['is_correct']))
+        if not dates:
+            return
+
+        self.date = np.concatenate([self.date, np.array(dates, dtype='datetime64[s]')])
+        self.duration = np.concatenate([self.duration, np.frombuffer(duration, dtype=np.int32)])
+        self.total = np.concatenate([self.total, np.frombuffer(total, dtype=np.int32)])
+        self.correct = np.concatenate([self.correct, np.frombuffer(correct, dtype=np.int32)])
+        self.percentage = np.concatenate([self.percentage, np.frombuffer(percentage, dtype=np.float32)])
+        self.answer_test = np.concatenate([self.answer_test, np.frombuffer(answer_test, dtype=np.int32)])
+        self.question_id = np.concatenate([self.question_id, np.frombuffer(question_id, dtype=np.int32)])
+        self.is_correct = np.concatenate([self.is_correct, np.frombuffer(is_correct, dtype=np.int8).astype(bool)])
+
+
+def question_difficulty(columns, min_answers=1):
+    """(id pytań, liczba odpowiedzi, odsetek błędów) - posortowane od najtrudniejszego"""
+    # id pytań to małe liczby całkowite - bincount wprost po id, bez sortowania
+    answered = np.bincount(columns.question_id)
+    wrong = np.bincount(columns.question_id, weights=~columns.is_correct, minlength=len(answered))
+    ids = np.flatnonzero(answered >= max(min_answers, 1))
+    answered, error_rate = answered[ids], wrong[ids] / answered[ids]
+    # najpierw odsetek błędów, przy remisie więcej odpowiedzi
+    order = np.lexsort((-answered, -error_rate))
+    return ids[order], answered[order], error_rate[order]
+
+
+def topic_accuracy(columns, topic_of):
+    """{temat: (liczba odpowiedzi, odsetek poprawnych)}; topic_of: {id pytania: temat}"""
+    if not len(columns.question_id):
+        return {}
+    topics = sorted(set(topic_of.values()))
+    code = {t: i for i, t in enumerate(topics)}
+    # tablica id pytania -> numer tematu (-1: pytanie bez tematu / spoza bazy)
+    lookup = np.full(max(int(columns.question_id.max()), max(topic_of, default=0)) + 1, -1, dtype=np.int32)
+    for qid, topic in topic_of.items():
+        lookup[qid] = code[topic]
+    topic_idx = lookup[columns.question_id]
+    known = topic_idx >= 0
+    answered = np.bincount(topic_idx[known], minlength=len(topics))
+    right = np.bincount(topic_idx[known], weights=columns.is_correct[known], minlength=len(topics))
+    return {
+        t: (int(answered[i]), float(right[i] / answered[i]))
+        for i, t in enumerate(topics) if answered[i]
+    }
+
+
+def score_trend(columns, window=10):
+    """Średnia krocząca wyniku (%) z `window` testów i nachylenie trendu (pkt % na test)"""
+    p = columns.percentage.astype(np.float64)
+    if not len(p):
+        return p, 0.0
+    window = min(window, len(p))
+    c = np.cumsum(np.concatenate([[0.0], p]))
+    moving = (c[window:] - c[:-window]) / window
+    if len(p) < 2:
+        return moving, 0.0
+    x = np.arange(len(p), dtype=np.float64)
+    slope = np.polyfit(x, p, 1)[0]
+    return moving, float(slope)
+
+
+def time_stats(columns):
+    """Czas testu: średnia i mediana (s) oraz średni czas na pytanie (s)"""
+    if not len(columns):
+        return {'mean': 0.0, 'median': 0.0, 'per_question': 0.0}
+    d = columns.duration.astype(np.float64)
+    return {
+        'mean': float(d.mean()),
+        'median': float(np.median(d)),
+        'per_question': float(d.sum() / max(int(columns.total.sum()), 1)),
+    }
+
+
+def summary(columns, topic_of=None, hardest=10, window=10):
+    """Wszystkie statystyki do zakładki "Statystyki" """
+    ids, answered, error_rate = question_difficulty(columns)
+    moving, slope = score_trend(columns, window)
+    return {
+        'tests': len(columns),
+        'answers': len(columns.question_id),
+        'mean_percentage': float(columns.percentage.mean()) if len(columns) else 0.0,
+        'best_percentage': float(columns.percentage.max()) if len(columns) else 0.0,
+        'recent_mean': float(moving[-1]) if len(moving) else 0.0,
+        'trend_slope': slope,
+        'time': time_stats(columns),
+        'hardest': list(zip(ids[:hardest].tolist(), answered[:hardest].tolist(), error_rate[:hardest].tolist())),
+        'topics': topic_accuracy(columns, topic_of) if topic_of else {},
+        'first_date': str(columns.date[0]) if len(columns) else None,
+        'last_date': str(columns.date[-1]) if len(columns) else None,
+    }
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Logika testu bez GUI: losowanie pytań, kolejność odpowiedzi, ocena i zapis wyniku
+
+Silnik nie zależy od Tkintera - steruje nim GUI, ale można go też używać
+w serwerze, benchmarkach i testach obciążeniowych (wiele sesji naraz,
+wspólna baza pytań tylko do odczytu).
+"""
+
+import datetime
+import random
+
+from quiz_model import AnswerOrder
+
+# Liczba pytań w zwykłym teście
+TEST_SIZE = 20
+
+
+class QuizSession:
+    """Stan jednego testu: wylosowane pytania, kolejność odpowiedzi, udzielone odpowiedzi"""
+
+    __slots__ = ('questions', 'orders', 'index', 'answers', 'correct', 'start_time', 'finished')
+
+    def __init__(self, questions, start_time):
+        self.questions = questions
+        self.orders = [None] * len(questions)  # AnswerOrder losowany przy pierwszym pokazaniu
+        self.index = 0
+        self.answers = []
+        self.correct = 0
+        self.start_time = start_time
+        self.finished = False
+
+    @property
+    def total(self):
+        return len(self.questions)
+
+    @property
+    def done(self):
+        """Czy odpowiedziano już na wszystkie pytania"""
+        return self.index >= len(self.questions)
+
+
+class AnswerResult:
+    """Wynik odpowiedzi na jedno pytanie"""
+
+    __slots__ = ('question', 'order', 'choice', 'is_correct')
+
+    def __init__(self, question, order, choice, is_correct):
+        self.question = question
+        self.order = order
+        self.choice = choice
+        self.is_correct = is_correct
+
+    @property
+    def correct_choice(self):
+        """Pozycja prawidłowej odpowiedzi na ekranie"""
+        return self.order.correct
+
+    @property
+    def correct_text(self):
+        return self.order.answers[self.order.correct]
+
+
+class QuizEngine:
+    """Prowadzenie testów na wspólnej bazie pytań (JsonQuestionBank lub SqliteStore)"""
+
+    def __init__(self, bank, save=None, rng=None, clock=datetime.datetime.now, selector=None, topics=None):
+        self.bank = bank
+        self.question_ids = bank.question_ids()
+        self.save = save  # save(rekord) - zapis zakończonego testu, np. HistoryStore.append
+        self.rng = rng or random.Random()
+        self.clock = clock
+        # quiz_adaptive.AdaptiveSelector - statystyki pytań do trybu adaptacyjnego
+        self.selector = selector
+        # quiz_topics.TopicIndex - id pytań per temat do testów z jednego tematu
+        self.topics = topics
+
+    def start(self, count=TEST_SIZE, adaptive=False, topic=None):
+        """Nowa sesja z `count` losowymi pytaniami (None - wszystkie pytania, przetasowane).
+
+        adaptive=True losuje częściej pytania z dużym odsetkiem błędów,
+        a rzadziej te z ostatnich testów (wymaga `selector`).
+        topic ogranicza losowanie do pytań z jednego tematu (wymaga `topics`).
+        """
+        if topic is not None:
+            if self.topics is None:
+                raise ValueError("Test z tematu wymaga indeksu tematów (topics)")
+            ids = list(self.topics.question_ids(topic))
+            if not ids:
+                raise ValueError(f"Brak pytań z tematu: {topic}")
+            if count is not None and count < len(ids):
+                ids = self.rng.sample(ids, count)
+            else:
+                self.rng.shuffle(ids)
+        elif adaptive:
+            if self.selector is None:
+                raise ValueError("Tryb adaptacyjny wymaga statystyk pytań (selector)")
+            ids = self.selector.sample(len(self.question_ids) if count is None else count, self.rng)
+        elif count is None or count >= len(self.question_ids):
+            ids = self.question_ids.copy()
+            self.rng.shuffle(ids)
+        else:
+            ids = self.rng.sample(self.question_ids, count)
+        return QuizSession(self.bank.get_questions(ids), self.clock())
+
+    def question(self, session):
+        """Bieżące pytanie sesji i kolejność jego odpowiedzi; None, gdy pytania się skończyły"""
+        if session.done:
+            return None
+        order = session.orders[session.index]
+        if order is None:
+            order = session.orders[session.index] = AnswerOrder(session.questions[session.index], self.rng)
+        return session.questions[session.index], order
+
+    def answer(self, session, choice):
+        """Zapisz odpowiedź (pozycja na ekranie) na bieżące pytanie i przejdź do następnego"""
+        current = self.question(session)
+        if current is None or session.finished:
+            raise ValueError("Brak pytania do odpowiedzi w tej sesji")
+        question, order = current
+        if not 0 <= choice < len(order.answers):
+            raise ValueError(f"Nieprawidłowy numer odpowiedzi: {choice}")
+
+        is_correct = choice == order.correct
+        # Do historii trafia oryginalny indeks odpowiedzi z bazy
+        session.answers.append({
+            'question_id': question.id,
+            'user_answer': order.original_index(choice),
+            'correct_answer': question.correct,
+            'is_correct': is_correct
+        })
+        if is_correct:
+            session.correct += 1
+        session.index += 1
+        return AnswerResult(question, order, choice, is_correct)
+
+    def finish(self, session):
+        """Zakończ sesję: policz wynik, zapisz go (jeśli podano `save`) i zwróć rekord historii"""
+        if session.finished:
+            raise ValueError("Sesja została już zakończona")
+        if not session.done:
+            raise ValueError(f"Test nie jest ukończony: odpowiedziano na {session.index} z {session.total} pytań")
+        session.finished = True
+
+        end_time = self.clock()
+        duration = (end_time - session.start_time).total_seconds()
+        total = session.total
+        percentage = (session.correct / total) * 100 if total else 0.0
+        record = {
+            'date': end_time.isoformat(),
+            'duration_seconds': int(duration),
+            'total': total,
+            'correct': session.correct,
+            'percentage': round(percentage, 1),
+            'answers': session.answers
+        }
+        if self.save is not None:
+            self.save(record)
+        if self.selector is not None:
+            self.selector.record(record)
+        return record
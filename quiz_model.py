@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Model pytania testowego
+
+Pytanie jest parsowane raz przy wczytaniu bazy (podział na opis i kod,
+liczba linii, temat), a losowa kolejność odpowiedzi w danym teście
+trzymana jest osobno - obiekty z bazy są współdzielone i się nie zmieniają.
+"""
+
+import random
+
+CODE_START = '```python'
+CODE_END = '```'
+
+
+class Question:
+    """Pytanie z bazy - niezmienne po utworzeniu, współdzielone przez wszystkie testy"""
+
+    __slots__ = (
+        'id', 'typ', 'topic', 'text', 'prose', 'code', 'prose_lines', 'code_lines',
+        'answers', 'correct', 'explanation'
+    )
+
+    def __init__(self, id, typ, text, answers, correct, explanation='', topic=None):
+        self.id = id
+        self.typ = typ
+        self.topic = topic
+        self.text = text
+        self.answers = tuple(answers)
+        self.correct = correct
+        self.explanation = explanation
+
+        # Wyodrębnij kod z pytania (```python ... ```)
+        if CODE_START in text:
+            parts = text.split(CODE_START)
+            self.prose = parts[0].strip()
+            self.code = parts[1].split(CODE_END)[0].strip()
+        else:
+            self.prose = text
+            self.code = None
+        self.prose_lines = self.prose.count('\n') + 1
+        self.code_lines = self.code.count('\n') + 1 if self.code is not None else 0
+
+    @classmethod
+    def from_dict(cls, d):
+        """Utwórz pytanie z rekordu JSON bazy pytań"""
+        return cls(
+            d['id'], d['typ'], d['pytanie'], d['odpowiedzi'], d['prawidlowa'],
+            d.get('tlumaczenie', ''), d.get('temat')
+        )
+
+    def to_dict(self):
+        """Rekord w formacie pliku JSON bazy pytań"""
+        d = {
+            'id': self.id,
+            'typ': self.typ,
+            'pytanie': self.text,
+            'odpowiedzi': list(self.answers),
+            'prawidlowa': self.correct,
+            'tlumaczenie': self.explanation,
+        }
+        if self.topic is not None:
+            d['temat'] = self.topic
+        return d
+
+    def __repr__(self):
+        return f'Question(id={self.id!r}, typ={self.typ!r})'
+
+
+class AnswerOrder:
+    """Kolejność odpowiedzi wylosowana dla jednego pytania w jednym teście"""
+
+    __slots__ = ('answers', 'correct', 'mapping')
+
+    def __init__(self, question, rng=random):
+        # mapping: nowy_indeks -> oryginalny indeks odpowiedzi
+        self.mapping = list(range(len(question.answers)))
+        rng.shuffle(self.mapping)
+        self.answers = [question.answers[i] for i in self.mapping]
+        self.correct = self.mapping.index(question.correct)
+
+    def original_index(self, choice):
+        """Indeks odpowiedzi w bazie dla wybranej pozycji na ekranie"""
+        return self.mapping[choice]
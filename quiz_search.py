@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wyszukiwanie pełnotekstowe w bazie pytań i w ściądze (SCIAGA_PYTHON.md)
+
+Indeks odwrócony budowany jest raz (albo wczytywany z pliku cache). Słownik
+tokenów jest posortowany, więc tokeny zaczynające się od wpisywanego prefiksu
+to ciągły przedział numerów - wyszukiwanie w trakcie pisania to bisect
+i przejście po listach dokumentów, bez skanowania bazy. Gdy użytkownik
+dopisuje litery, wynik poprzedniego zapytania jest tylko zawężany.
+"""
+
+import base64
+import heapq
+import json
+import math
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from text_tokens import STOPWORDS, iter_tokens
+
+# Podbić przy zmianie budowy indeksu lub formatu pliku cache
+SEARCH_VERSION = 1
+
+# Wagi pól: trafienie w treści pytania lub tytule sekcji liczy się bardziej
+FIELD_WEIGHTS = {'pytanie': 3.0, 'odpowiedzi': 1.0, 'tlumaczenie': 1.0, 'tytul': 3.0, 'tresc': 1.0}
+
+# Najkrótszy szukany prefiks (tokeny w indeksie mają min. 3 znaki)
+MIN_PREFIX = 3
+
+# Ile ostatnich zapytań pamiętać (cofanie liter w polu wyszukiwania)
+QUERY_CACHE_SIZE = 128
+
+LAST_WORD_RE = re.compile(r'\w+$')
+HEADING_RE = re.compile(r'^(#{1,3})\s+(.*)$')
+
+
+def theory_sections(text):
+    """[(nr linii nagłówka od 1, tytuł, treść)] - sekcje ściągi wg nagłówków # / ## / ###.
+
+    Linie zaczynające się od # wewnątrz bloków ``` to komentarze w kodzie, nie nagłówki.
+    """
+    sections = []
+    title, start, body = None, 1, []
+    in_code = False
+    for n, line in enumerate(text.splitlines(), 1):
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+        m = None if in_code else HEADING_RE.match(line)
+        if m is None:
+            body.append(line)
+            continue
+        if title is not None or any(body):
+            sections.append((start, title or '', '\n'.join(body).strip()))
+        title, start, body = m.group(2).strip(), n, []
+    if title is not None or any(body):
+        sections.append((start, title or '', '\n'.join(body).strip()))
+    return sections
+
+
+def source_signature(*paths):
+    """Podpis plików źródłowych indeksu (mtime, rozmiar) + wersja - do sprawdzania cache"""
+    parts = [str(SEARCH_VERSION)]
+    for path in paths:
+        try:
+            st = os.stat(path)
+            parts.append(f'{st.st_mtime_ns}:{st.st_size}')
+        except OSError:
+            parts.append('-')
+    return ';'.join(parts)
+
+
+def parse_query(query):
+    """(pełne słowa, prefiks) - ostatnie słowo bez spacji po nim jest traktowane jako niedokończone"""
+    query = query.lower()
+    prefix = ''
+    m = LAST_WORD_RE.search(query)
+    if m is not None:
+        prefix = m.group() if len(m.group()) >= MIN_PREFIX else ''
+        query = query[:m.start()]
+    return tuple(dict.fromkeys(iter_tokens(query))), prefix
+
+
+def _pack(arrays, typecode):
+    """Lista tablic -> (przesunięcia, wartości) zakodowane base64 do JSON"""
+    offsets = array('i', [0])
+    values = array(typecode)
+    for a in arrays:
+        values.extend(a)
+        offsets.append(len(values))
+    return base64.b64encode(offsets.tobytes()).decode('ascii'), base64.b64encode(values.tobytes()).decode('ascii')
+
+
+def _unpack(packed, typecode):
+    offsets = array('i')
+    offsets.frombytes(base64.b64decode(packed[0]))
+    values = array(typecode)
+    values.frombytes(base64.b64decode(packed[1]))
+    return [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+class SearchIndex:
+    """Indeks odwrócony nad pytaniami i sekcjami ściągi, z rankingiem tf-idf"""
+
+    def __init__(self, docs, vocab, postings, forward, signature=''):
+        self.docs = docs  # [(rodzaj, ref, tytuł)]: ('pytanie', id, ...) lub ('teoria', nr linii, ...)
+        self.vocab = vocab  # posortowane tokeny; numer tokenu = pozycja na liście
+        self.postings = postings  # numer tokenu -> (array dokumentów, array wag)
+        self.forward = forward  # dokument -> (array rosnących numerów tokenów, array wag)
+        self.signature = signature
+        self.token_ids = {t: i for i, t in enumerate(vocab)}
+        n = len(docs)
+        self.idf = array('d', (math.log(1 + n / len(d)) for d, _ in postings))
+        self._cache = OrderedDict()
+        self._last = None  # (słowa, prefiks, wyniki za słowa, dokumenty z prefiksem)
+
+    @classmethod
+    def build(cls, questions, sections=(), signature=''):
+        """Indeks z pytań (Question) i sekcji ściągi z theory_sections()"""
+        docs = []
+        doc_weights = []
+        for q in questions:
+            w = {}
+            cls._add_field(w, q.text, 'pytanie')
+            cls._add_field(w, ' '.join(q.answers), 'odpowiedzi')
+            cls._add_field(w, q.explanation, 'tlumaczenie')
+            docs.append(('pytanie', q.id, (q.prose.splitlines() or [''])[0][:100]))
+            doc_weights.append(w)
+        for line, title, body in sections:
+            w = {}
+            cls._add_field(w, title, 'tytul')
+            cls._add_field(w, body, 'tresc')
+            docs.append(('teoria', line, title))
+            doc_weights.append(w)
+
+        vocab = sorted({t for w in doc_weights for t in w})
+        token_ids = {t: i for i, t in enumerate(vocab)}
+        post_docs = [[] for _ in vocab]
+        post_weights = [[] for _ in vocab]
+        forward = []
+        for d, w in enumerate(doc_weights):
+            tokens = sorted(w)  # kolejność alfabetyczna = rosnące numery tokenów
+            ids = array('i', map(token_ids.__getitem__, tokens))
+            weights = array('f', map(w.__getitem__, tokens))
+            for i, x in zip(ids, weights):
+                post_docs[i].append(d)
+                post_weights[i].append(x)
+            forward.append((ids, weights))
+        postings = [(array('i', d), array('f', w)) for d, w in zip(post_docs, post_weights)]
+        return cls(docs, vocab, postings, forward, signature)
+
+    @staticmethod
+    def _add_field(weights, text, field):
+        weight = FIELD_WEIGHTS[field]
+        for t in iter_tokens(text):
+            weights[t] = weights.get(t, 0.0) + weight
+
+    @classmethod
+    def load(cls, path, signature):
+        """Indeks z pliku cache albo None, jeśli go nie ma lub źródła się zmieniły"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('signature') != signature:
+            return None
+        postings = list(zip(_unpack(data['postings_docs'], 'i'), _unpack(data['postings_weights'], 'f')))
+        forward = list(zip(_unpack(data['forward_tokens'], 'i'), _unpack(data['forward_weights'], 'f')))
+        docs = [tuple(d) for d in data['docs']]
+        return cls(docs, data['vocab'], postings, forward, signature)
+
+    def save(self, path):
+        """Zapisz indeks atomowo (plik tymczasowy + os.replace)"""
+        data = {
+            'signature': self.signature,
+            'docs': self.docs,
+            'vocab': self.vocab,
+            'postings_docs': _pack([d for d, _ in self.postings], 'i'),
+            'postings_weights': _pack([w for _, w in self.postings], 'f'),
+            'forward_tokens': _pack([t for t, _ in self.forward], 'i'),
+            'forward_weights': _pack([w for _, w in self.forward], 'f'),
+        }
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def prefix_range(self, prefix):
+        """Przedział numerów tokenów zaczynających się od `prefix`"""
+        lo = bisect_left(self.vocab, prefix)
+        return lo, bisect_left(self.vocab, prefix + '\uffff', lo)
+
+    def search(self, query, limit=50):
+        """[(rodzaj, ref, tytuł, wynik)] od najlepiej pasujących; wszystkie słowa muszą wystąpić"""
+        key = parse_query(query)
+        scores = self._cache.get(key)
+        if scores is None:
+            scores = self._match(*key)
+            self._cache[key] = scores
+            if len(self._cache) > QUERY_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(*self.docs[d], score) for d, score in top]
+
+    def _match(self, terms, prefix):
+        """{dokument: wynik} dla zapytania"""
+        lo = hi = 0
+        if prefix:
+            lo, hi = self.prefix_range(prefix)
+            if lo == hi:
+                if prefix not in STOPWORDS:
+                    return {}
+                prefix = ''  # dokończone słowo ze stopwords - pomijane jak w indeksie
+        if not terms and not prefix:
+            return {}
+
+        last = self._last
+        if prefix and last is not None and last[0] == terms and last[1] and prefix.startswith(last[1]):
+            # dopisana litera: dokumenty z nowym prefiksem są wśród tych ze starym
+            base, candidates = last[2], last[3]
+        else:
+            base = self._match_terms(terms) if terms else None
+            if base is not None and not base:
+                return {}
+            candidates = None
+
+        if not prefix:
+            self._last = (terms, '', base, None)
+            return dict(base)
+
+        if candidates is None and base is None:
+            # samo słowo w trakcie pisania - suma list dokumentów tokenów z przedziału
+            prefix_scores = {}
+            for i in range(lo, hi):
+                docs, weights = self.postings[i]
+                idf = self.idf[i]
+                for d, w in zip(docs, weights):
+                    prefix_scores[d] = prefix_scores.get(d, 0.0) + w * idf
+        else:
+            prefix_scores = {}
+            for d in (candidates if candidates is not None else base):
+                s = self._range_score(d, lo, hi)
+                if s:
+                    prefix_scores[d] = s
+
+        self._last = (terms, prefix, base, list(prefix_scores))
+        if base is None:
+            return prefix_scores
+        return {d: s + base[d] for d, s in prefix_scores.items()}
+
+    def _match_terms(self, terms):
+        """{dokument: wynik} dla dokumentów zawierających wszystkie słowa (None - brak słów)"""
+        ids = []
+        for t in terms:
+            i = self.token_ids.get(t)
+            if i is None:
+                return {}
+            ids.append(i)
+        # od najrzadszego słowa - najmniej kandydatów do sprawdzenia
+        ids.sort(key=lambda i: len(self.postings[i][0]))
+        docs, weights = self.postings[ids[0]]
+        idf = self.idf[ids[0]]
+        scores = {d: w * idf for d, w in zip(docs, weights)}
+        for i in ids[1:]:
+            docs, weights = self.postings[i]
+            idf = self.idf[i]
+            if len(scores) * 8 < len(docs):
+                # mało kandydatów - sprawdzamy ich tokeny zamiast długiej listy dokumentów
+                scores = {d: s + w for d, s in scores.items() if (w := self._range_score(d, i, i + 1))}
+            else:
+                scores = {d: scores[d] + w * idf for d, w in zip(docs, weights) if d in scores}
+            if not scores:
+                break
+        return scores
+
+    def _range_score(self, d, lo, hi):
+        """Suma wag tf-idf tokenów dokumentu `d` o numerach z przedziału [lo, hi)"""
+        ids, weights = self.forward[d]
+        k = bisect_left(ids, lo)
+        score = 0.0
+        while k < len(ids) and ids[k] < hi:
+            score += weights[k] * self.idf[ids[k]]
+            k += 1
+        return score
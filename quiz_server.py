@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serwer HTTP/JSON z testem Python dla całej grupy naraz (asyncio, bez zależności)
+
+Baza pytań wczytywana jest raz i współdzielona (tylko do odczytu), a stan
+testów trzymany w pamięci - każda sesja to QuizSession z quiz_engine.
+
+    python quiz_server.py [--host 0.0.0.0] [--port 8000]
+
+Endpointy (JSON):
+    POST /sessions                {"count": 20, "topic": "OOP"}  (count null - wszystkie pytania)
+    GET  /topics                  tematy i liczba pytań
+    GET  /sessions/<id>           bieżące pytanie
+    POST /sessions/<id>/answer    {"choice": 0}
+    POST /sessions/<id>/finish    wynik testu (zapisywany do historii w tle)
+    GET  /health
+    GET  /metrics                 kolejka zapisu historii i czasy zapisu paczek
+"""
+
+import argparse
+import asyncio
+import json
+import secrets
+import signal
+import time
+import traceback
+from pathlib import Path
+
+from quiz_engine import TEST_SIZE, QuizEngine
+from quiz_storage import BatchedWriter, HistoryStore, JsonQuestionBank
+from quiz_topics import TopicIndex
+
+# Maksymalny rozmiar ciała żądania i czas życia nieaktywnej sesji
+MAX_BODY = 64 * 1024
+SESSION_TTL = 2 * 60 * 60
+SWEEP_INTERVAL = 60
+
+REASONS = {
+    200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large',
+    431: 'Request Header Fields Too Large', 500: 'Internal Server Error'
+}
+
+
+class HttpError(Exception):
+    """Błąd zwracany klientowi jako odpowiedź JSON z kodem HTTP"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def question_payload(session, current):
+    """Pytanie do wysłania klientowi - bez informacji o prawidłowej odpowiedzi"""
+    if current is None:
+        return None
+    question, order = current
+    return {
+        'index': session.index,
+        'total': session.total,
+        'id': question.id,
+        'typ': question.typ,
+        'text': question.prose,
+        'code': question.code,
+        'answers': order.answers,
+    }
+
+
+class QuizServer:
+    """Sesje testów w pamięci obsługiwane przez jeden QuizEngine"""
+
+    def __init__(self, engine, writer=None):
+        self.engine = engine
+        self.writer = writer
+        self.sessions = {}  # id -> [QuizSession, czas ostatniego użycia]
+        self.requests = 0
+
+    def _session(self, session_id):
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            raise HttpError(404, 'Nie ma takiej sesji')
+        entry[1] = time.monotonic()
+        return entry[0]
+
+    def handle(self, method, path, body):
+        """Obsłuż żądanie; zwraca (status, obiekt JSON)"""
+        parts = [p for p in path.split('?', 1)[0].split('/') if p]
+
+        if parts == ['health']:
+            return 200, {'status': 'ok', 'sessions': len(self.sessions), 'requests': self.requests}
+
+        if parts == ['topics']:
+            return 200, {'topics': [{'topic': t, 'questions': n} for t, n in self.engine.topics.topics()]}
+
+        if parts == ['metrics']:
+            return 200, {
+                'sessions': len(self.sessions),
+                'requests': self.requests,
+                'history': self.writer.metrics() if self.writer is not None else None,
+            }
+
+        if parts == ['sessions']:
+            if method != 'POST':
+                raise HttpError(405, 'Dozwolone: POST')
+            count = body.get('count', TEST_SIZE)
+            if count is not None and (isinstance(count, bool) or not isinstance(count, int) or count < 1):
+                raise HttpError(400, 'count musi być dodatnią liczbą lub null')
+            topic = body.get('topic')
+            if topic is not None and (isinstance(topic, bool) or not isinstance(topic, (str, int))):
+                raise HttpError(400, 'topic musi być tekstem lub liczbą')
+            if topic is not None and topic not in self.engine.topics.ids:
+                raise HttpError(404, f'Nieznany temat: {topic}')
+            session = self.engine.start(count, topic=topic)
+            session_id = secrets.token_urlsafe(12)
+            self.sessions[session_id] = [session, time.monotonic()]
+            return 201, {
+                'session': session_id,
+                'question': question_payload(session, self.engine.question(session)),
+            }
+
+        if len(parts) >= 2 and parts[0] == 'sessions':
+            session = self._session(parts[1])
+            action = parts[2] if len(parts) == 3 else None
+
+            if len(parts) == 2:
+                if method != 'GET':
+                    raise HttpError(405, 'Dozwolone: GET')
+                return 200, {'question': question_payload(session, self.engine.question(session))}
+
+            if method != 'POST':
+                raise HttpError(405, 'Dozwolone: POST')
+
+            if action == 'answer':
+                choice = body.get('choice')
+                if isinstance(choice, bool) or not isinstance(choice, int):
+                    raise HttpError(400, 'choice musi być liczbą całkowitą')
+                try:
+                    result = self.engine.answer(session, choice)
+                except ValueError as e:
+                    raise HttpError(409, str(e))
+                return 200, {
+                    'is_correct': result.is_correct,
+                    'correct_choice': result.correct_choice,
+                    'explanation': result.question.explanation,
+                    'question': question_payload(session, self.engine.question(session)),
+                }
+
+            if action == 'finish':
+                try:
+                    record = self.engine.finish(session)
+                except ValueError as e:
+                    raise HttpError(409, str(e))
+                del self.sessions[parts[1]]
+                return 200, {k: v for k, v in record.items() if k != 'answers'}
+
+        raise HttpError(404, 'Nieznany adres')
+
+    def sweep(self):
+        """Usuń sesje nieużywane dłużej niż SESSION_TTL"""
+        deadline = time.monotonic() - SESSION_TTL
+        for session_id in [s for s, (_, seen) in self.sessions.items() if seen < deadline]:
+            del self.sessions[session_id]
+
+    async def sweep_forever(self):
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            self.sweep()
+
+    async def serve_client(self, reader, writer):
+        """Połączenie HTTP/1.1 z keep-alive: wiele żądań po kolei na jednym gnieździe"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'Niepoprawne żądanie'}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                self.requests += 1
+                body_read = False  # bez odczytanego ciała nie wiadomo, gdzie zaczyna się następne żądanie
+                try:
+                    length = headers.get('content-length', '0')
+                    if not (length.isascii() and length.isdigit()):
+                        raise HttpError(400, 'Niepoprawny nagłówek Content-Length')
+                    length = int(length)
+                    if length > MAX_BODY:
+                        raise HttpError(413, 'Za duże żądanie')
+                    raw = await reader.readexactly(length) if length else b''
+                    body_read = True
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except ValueError:
+                        raise HttpError(400, 'Niepoprawny JSON')
+                    if not isinstance(body, dict):
+                        raise HttpError(400, 'Oczekiwano obiektu JSON')
+                    status, payload = self.handle(method, path, body)
+                except HttpError as e:
+                    status, payload = e.status, {'error': e.message}
+                except Exception:
+                    traceback.print_exc()
+                    status, payload = 500, {'error': 'Błąd serwera'}
+                keep_alive = keep_alive and body_read
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ValueError:
+            # readline(): wiersz dłuższy niż limit bufora StreamReader (64 KiB)
+            await self._respond(writer, 431, {'error': 'Za długi wiersz żądania lub nagłówek'}, False)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f'HTTP/1.1 {status} {REASONS.get(status, "")}\r\n'
+            f'Content-Type: application/json; charset=utf-8\r\n'
+            f'Content-Length: {len(data)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+        ).encode('latin-1')
+        writer.write(head + data)
+        await writer.drain()
+
+
+async def run_server(app, host, port):
+    server = await asyncio.start_server(app.serve_client, host, port, backlog=1024)
+    sweeper = asyncio.create_task(app.sweep_forever())
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"Serwer testu działa na http://{host}:{port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        sweeper.cancel()
+
+
+def main(argv=None):
+    base = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Serwer HTTP/JSON testu Python")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000, help="0 - wybierz wolny port")
+    parser.add_argument('--questions', type=Path, default=base / "test_python_baza_pytan.json")
+    parser.add_argument('--history', type=Path, default=base / "test_python_historia_serwer.jsonl",
+                        help="plik JSON Lines z wynikami testów z serwera")
+    parser.add_argument('--batch', type=int, default=256, help="maks. liczba wyników w jednym zapisie")
+    parser.add_argument('--batch-delay', type=float, default=0.05,
+                        help="maks. czas oczekiwania wyniku na zapis (s)")
+    args = parser.parse_args(argv)
+
+    bank = JsonQuestionBank.from_file(args.questions)
+    # Wyniki zapisywane w tle paczkami - zakończenie testu nie czeka na dysk
+    writer = BatchedWriter(HistoryStore(args.history), max_batch=args.batch, max_delay=args.batch_delay)
+    engine = QuizEngine(bank, save=writer.append, topics=TopicIndex.build(bank.questions))
+    # SIGTERM kończy serwer jak Ctrl+C - kolejka wyników zostanie zapisana
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(run_server(QuizServer(engine, writer), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+        if writer.unsaved:
+            print(f"Nie zapisano {len(writer.unsaved)} wyników testów", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Przechowywanie bazy pytań i historii testów
+
+- JSON (domyślnie): baza pytań z pliku JSON, historia jako append-only JSON Lines
+- SQLite (opcjonalnie): pytania i testy w jednej bazie z indeksami
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from quiz_model import Question
+from quiz_topics import TOPICS_VERSION, TopicClassifier
+
+# Rozmiar bloku przy czytaniu pliku od końca
+READ_BLOCK = 64 * 1024
+
+
+class HistoryStore:
+    """Historia testów w pliku JSON Lines: jeden test na linię, najstarszy pierwszy.
+
+    Zapis dopisuje jedną linię (bez przepisywania pliku), odczyt ostatnich
+    testów czyta plik od końca - koszt nie zależy od długości historii.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+
+    def migrate_legacy(self):
+        """Jednorazowa migracja ze starego pliku JSON (lista, najnowszy pierwszy).
+
+        Stary plik zostaje nietknięty; migracja nie powtarza się, bo plik
+        JSONL już istnieje. Zwraca liczbę przeniesionych testów.
+        """
+        if self.path.exists() or not self.legacy_path or not self.legacy_path.exists():
+            return 0
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        self.write_all(reversed(legacy))
+        return len(legacy)
+
+    def write_all(self, records):
+        """Zapisz całą historię atomowo (plik tymczasowy + os.replace)"""
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def append(self, record):
+        """Dopisz jeden test na koniec historii"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Dopisz wiele testów jednym zapisem (write + fsync)"""
+        data = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records).encode('utf-8')
+        if not data:
+            return
+        flags = os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        fd = os.open(self.path, flags, 0o644)
+        try:
+            # Urwana ostatnia linia (np. po awarii) - zaczynamy od nowej, żeby jej nie skleić
+            if os.fstat(fd).st_size:
+                os.lseek(fd, -1, os.SEEK_END)
+                if os.read(fd, 1) != b'\n':
+                    data = b'\n' + data
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def repair(self):
+        """Napraw koniec pliku po awarii w trakcie zapisu; zwraca liczbę usuniętych bajtów.
+
+        Urwana ostatnia linia jest obcinana, a kompletna linia bez końcowego
+        znaku nowej linii - uzupełniana.
+        """
+        try:
+            f = open(self.path, 'r+b')
+        except FileNotFoundError:
+            return 0
+        with f:
+            size = f.seek(0, os.SEEK_END)
+            if not size:
+                return 0
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return 0
+            keep = 0
+            pos = size
+            while pos > 0:
+                step = min(READ_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                i = f.read(step).rfind(b'\n')
+                if i >= 0:
+                    keep = pos + i + 1
+                    break
+            f.seek(keep)
+            try:
+                json.loads(f.read())
+                f.write(b'\n')
+                dropped = 0
+            except ValueError:
+                f.truncate(keep)
+                dropped = size - keep
+            f.flush()
+            os.fsync(f.fileno())
+            return dropped
+
+    def _lines_reversed(self):
+        """Linie pliku od ostatniej do pierwszej, czytane blokami od końca"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            tail = b''
+            while pos > 0:
+                step = min(READ_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + tail).split(b'\n')
+                tail = lines.pop(0)
+                for line in reversed(lines):
+                    if line.strip():
+                        yield line
+            if tail.strip():
+                yield tail
+
+    def recent(self, limit, offset=0):
+        """Najnowsze testy (najnowszy pierwszy), z pominięciem `offset` najnowszych"""
+        out = []
+        for line in self._lines_reversed():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # urwana linia po awarii - nie liczy się też do `offset`, tak jak w __iter__
+            if offset:
+                offset -= 1
+                continue
+            out.append(record)
+            if len(out) >= limit:
+                break
+        return out
+
+    def __iter__(self):
+        """Wszystkie testy od najstarszego"""
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class BatchedWriter:
+    """Zapis historii w tle (write-behind) dla wielu równoległych sesji.
+
+    append() tylko wrzuca test do kolejki. Wątek zapisujący zbiera testy
+    w paczki i zapisuje je jednym append_many (jeden write + fsync), gdy paczka
+    osiągnie max_batch albo najstarszy test czeka max_delay sekund. Przy
+    starcie naprawiany jest koniec pliku po ewentualnej awarii (store.repair).
+    SqliteStore zapisuje przez własne połączenie wątku (store.thread_writer).
+    """
+
+    _STOP = object()
+
+    def __init__(self, store, max_batch=256, max_delay=0.05):
+        self.store = store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.recovered_bytes = store.repair() if hasattr(store, 'repair') else 0
+        self.unsaved = []  # testy, których nie udało się zapisać do zamknięcia
+
+        # Metryki
+        self.batches = 0
+        self.written = 0
+        self.errors = 0
+        self.flush_last = 0.0
+        self.flush_max = 0.0
+        self.flush_total = 0.0
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._thread.start()
+
+    def append(self, record):
+        self._queue.put(record)
+
+    def queue_depth(self):
+        """Liczba testów czekających na zapis (w kolejce, bez bieżącej paczki)"""
+        return self._queue.qsize()
+
+    def metrics(self):
+        return {
+            'queue_depth': self.queue_depth(),
+            'batches': self.batches,
+            'written': self.written,
+            'errors': self.errors,
+            'flush_ms_last': round(self.flush_last * 1000, 3),
+            'flush_ms_avg': round(self.flush_total / self.batches * 1000, 3) if self.batches else 0.0,
+            'flush_ms_max': round(self.flush_max * 1000, 3),
+            'recovered_bytes': self.recovered_bytes,
+        }
+
+    def close(self, timeout=None):
+        """Zapisz wszystko, co jest w kolejce, i zatrzymaj wątek"""
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    def _flush(self, store, batch):
+        start = time.perf_counter()
+        try:
+            store.append_many(batch)
+        except (OSError, sqlite3.Error):
+            self.errors += 1
+            return False
+        elapsed = time.perf_counter() - start
+        self.batches += 1
+        self.written += len(batch)
+        self.flush_last = elapsed
+        self.flush_max = max(self.flush_max, elapsed)
+        self.flush_total += elapsed
+        return True
+
+    def _run(self):
+        # połączenie sqlite3 działa tylko w wątku, który je otworzył
+        store = self.store.thread_writer() if hasattr(self.store, 'thread_writer') else self.store
+        try:
+            self._write_loop(store)
+        finally:
+            if store is not self.store:
+                store.close()
+
+    def _write_loop(self, store):
+        pending = []
+        deadline = 0.0
+        stopping = False
+        failed_on_stop = 0
+        while True:
+            timeout = None if not pending else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is self._STOP:
+                stopping = True
+            elif item is not None:
+                if not pending:
+                    deadline = time.monotonic() + self.max_delay
+                pending.append(item)
+
+            if pending and (stopping or len(pending) >= self.max_batch or time.monotonic() >= deadline):
+                if self._flush(store, pending):
+                    pending = []
+                else:
+                    # błąd zapisu - paczka zostaje, ponowna próba po chwili
+                    deadline = time.monotonic() + self.max_delay
+                    if stopping:
+                        failed_on_stop += 1
+                        if failed_on_stop >= 3:
+                            self.unsaved = pending
+                            return
+                        time.sleep(self.max_delay)
+            if stopping and not pending:
+                return
+
+
+class JsonQuestionBank:
+    """Baza pytań wczytywana w całości z pliku JSON (parsowana raz do obiektów Question)"""
+
+    def __init__(self, questions):
+        self.questions = questions
+        self._by_id = {q.id: q for q in questions}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls([Question.from_dict(d) for d in json.load(f)])
+
+    def question_ids(self):
+        return [q.id for q in self.questions]
+
+    def get_questions(self, ids):
+        return [self._by_id[i] for i in ids]
+
+    def __len__(self):
+        return len(self.questions)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    typ TEXT,
+    topic TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_topic ON questions(topic);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    duration_seconds INTEGER,
+    total INTEGER,
+    correct INTEGER,
+    percentage REAL
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_date ON attempts(date);
+CREATE TABLE IF NOT EXISTS answers (
+    attempt_id INTEGER NOT NULL REFERENCES attempts(id),
+    question_id INTEGER NOT NULL,
+    user_answer INTEGER,
+    correct_answer INTEGER,
+    is_correct INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_answers_question ON answers(question_id, is_correct);
+CREATE INDEX IF NOT EXISTS idx_answers_attempt ON answers(attempt_id);
+"""
+
+
+class SqliteStore:
+    """Baza pytań i historia testów w SQLite.
+
+    Przy starcie czytane są tylko identyfikatory pytań; treść pobierana jest
+    dla wylosowanych pytań. Statystyki per pytanie to zapytania po indeksie
+    answers(question_id), a nie przegląd całej historii.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=FULL')
+        self.conn.executescript(SQLITE_SCHEMA)
+        # Pytania już pobrane z bazy (sparsowane obiekty Question)
+        self._questions = {}
+
+    def close(self):
+        self.conn.close()
+
+    def thread_writer(self):
+        """Osobne połączenie do tej samej bazy - do zapisu z innego wątku (np. BatchedWriter)"""
+        return SqliteStore(self.path)
+
+    def _meta(self, key):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    # --- pytania ---
+
+    def import_questions(self, json_path):
+        """Zaimportuj bazę pytań z JSON, jeśli plik (lub słowa kluczowe tematów) zmienił się od ostatniego importu.
+
+        Kolumna topic to jawny 'temat' pytania albo temat z klasyfikacji po słowach kluczowych.
+        """
+        json_path = Path(json_path)
+        st = json_path.stat()
+        signature = f'{st.st_mtime_ns}:{st.st_size}:{TOPICS_VERSION}'
+        if self._meta('questions_source') == signature:
+            return False
+        with open(json_path, 'r', encoding='utf-8') as f:
+            questions = json.load(f)
+        classifier = TopicClassifier()
+        self._questions.clear()
+        with self.conn:
+            self.conn.execute('DELETE FROM questions')
+            self.conn.executemany(
+                'INSERT INTO questions (id, typ, topic, data) VALUES (?, ?, ?, ?)',
+                [(q['id'], q.get('typ'), classifier.classify_question(q), json.dumps(q, ensure_ascii=False))
+                 for q in questions]
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', ('questions_source', signature)
+            )
+        return True
+
+    def question_ids(self, topic=None):
+        if topic is None:
+            rows = self.conn.execute('SELECT id FROM questions ORDER BY id')
+        else:
+            rows = self.conn.execute('SELECT id FROM questions WHERE topic = ? ORDER BY id', (topic,))
+        return [r[0] for r in rows]
+
+    def question_topics(self):
+        """{id pytania: temat} - z indeksu, bez wczytywania treści pytań"""
+        return dict(self.conn.execute('SELECT id, topic FROM questions ORDER BY id'))
+
+    def get_questions(self, ids):
+        """Pytania o podanych id, w kolejności `ids`"""
+        ids = list(ids)
+        by_id = self._questions
+        missing = [i for i in ids if i not in by_id]
+        # limit parametrów SQLite - pobieramy porcjami
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            marks = ','.join('?' * len(chunk))
+            for qid, data in self.conn.execute(f'SELECT id, data FROM questions WHERE id IN ({marks})', chunk):
+                by_id[qid] = Question.from_dict(json.loads(data))
+        return [by_id[i] for i in ids]
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM questions').fetchone()[0]
+
+    # --- historia ---
+
+    def import_history(self, records):
+        """Jednorazowy import historii (np. z HistoryStore), tylko gdy tabela jest pusta"""
+        if self.count() or not records:
+            return 0
+        records = list(records)
+        self.append_many(records)
+        return len(records)
+
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Zapisz testy wraz z odpowiedziami w jednej transakcji"""
+        with self.conn:
+            for r in records:
+                cur = self.conn.execute(
+                    'INSERT INTO attempts (date, duration_seconds, total, correct, percentage) VALUES (?, ?, ?, ?, ?)',
+                    (r['date'], r['duration_seconds'], r['total'], r['correct'], r['percentage'])
+                )
+                self.conn.executemany(
+                    'INSERT INTO answers (attempt_id, question_id, user_answer, correct_answer, is_correct) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    [(cur.lastrowid, a['question_id'], a['user_answer'], a['correct_answer'], int(a['is_correct']))
+                     for a in r.get('answers', [])]
+                )
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM attempts').fetchone()[0]
+
+    def recent(self, limit, offset=0):
+        """Najnowsze testy (bez listy odpowiedzi), najnowszy pierwszy"""
+        rows = self.conn.execute(
+            'SELECT date, duration_seconds, total, correct, percentage FROM attempts '
+            'ORDER BY date DESC, id DESC LIMIT ? OFFSET ?', (limit, offset)
+        )
+        return [
+            {'date': d, 'duration_seconds': dur, 'total': t, 'correct': c, 'percentage': p}
+            for d, dur, t, c, p in rows
+        ]
+
+    def __iter__(self):
+        """Wszystkie testy od najstarszego, z odpowiedziami"""
+        answers = {}
+        for attempt_id, qid, user, correct, ok in self.conn.execute(
+            'SELECT attempt_id, question_id, user_answer, correct_answer, is_correct FROM answers'
+        ):
+            answers.setdefault(attempt_id, []).append({
+                'question_id': qid, 'user_answer': user, 'correct_answer': correct, 'is_correct': bool(ok)
+            })
+        rows = self.conn.execute(
+            'SELECT id, date, duration_seconds, total, correct, percentage FROM attempts ORDER BY date, id'
+        )
+        for attempt_id, d, dur, t, c, p in rows.fetchall():
+            yield {
+                'date': d, 'duration_seconds': dur, 'total': t, 'correct': c, 'percentage': p,
+                'answers': answers.get(attempt_id, [])
+            }
+
+    # --- statystyki ---
+
+    def question_stats(self, question_id):
+        """(liczba odpowiedzi, liczba poprawnych) dla jednego pytania - zapytanie po indeksie"""
+        row = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(is_correct), 0) FROM answers WHERE question_id = ?', (question_id,)
+        ).fetchone()
+        return row[0], row[1]
+
+    def all_question_stats(self):
+        """{id pytania: (liczba odpowiedzi, liczba poprawnych)}"""
+        rows = self.conn.execute(
+            'SELECT question_id, COUNT(*), SUM(is_correct) FROM answers GROUP BY question_id'
+        )
+        return {qid: (n, ok) for qid, n, ok in rows}
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tematy pytań: jawne tagi 'temat' w bazie + automatyczna klasyfikacja po słowach kluczowych
+
+Indeks budowany jest raz przy wczytaniu bazy: dla każdego tematu gotowa
+tablica id pytań, więc test z jednego tematu to losowanie z tej tablicy,
+a nie filtrowanie całej bazy przy każdym starcie.
+"""
+
+import re
+from array import array
+from collections import Counter
+
+from text_tokens import iter_tokens
+
+# Podbić przy zmianie słów kluczowych - SqliteStore przeliczy tematy przy imporcie
+TOPICS_VERSION = 1
+
+# Temat pytania, które nie pasuje do żadnego innego
+DEFAULT_TOPIC = "Podstawy Pythona"
+
+# (temat, początki słów, wzorce w surowym tekście). Słowa porównywane są z tokenami
+# z text_tokens (małe litery, min. 3 znaki) jako prefiks, "-xyz" oznacza końcówkę.
+# Kolejność od tematów najbardziej szczegółowych - przy remisie wygrywa wcześniejszy.
+TOPICS = [
+    ("Generatory", ("yield", "generator", "generat", "iterator", "iterat", "__next__", "__iter__"),
+     (r"\(\s*[^()\n]*\bfor\b[^()\n]*\bin\b",)),
+    ("Dekoratory", ("dekorat", "decorat", "wrapper", "wraps", "staticmethod", "classmethod"),
+     (r"(?m)^\s*@\w+", r"def\s+\w+\(\s*func\b")),
+    ("Asyncio", ("async", "await", "asyncio", "coroutin", "korutyn", "gather", "event_loop"), ()),
+    ("List comprehension", ("comprehension", "składan", "skladan"),
+     (r"[\[{]\s*[^\]\n]*\bfor\b[^\]\n]*\bin\b",)),
+    ("Programowanie funkcyjne", ("map", "filter", "reduce", "functools", "lambda", "funkcyjn"), ()),
+    ("Serializacja", ("json", "pickle", "dumps", "loads", "dump", "serializ", "deserializ"), ()),
+    ("Testowanie", ("unittest", "testcase", "assert", "tdd", "pytest", "testow", "mock"), ()),
+    ("Web", ("flask", "route", "http", "html", "django", "endpoint", "jsonify", "webow"), ()),
+    ("NumPy", ("numpy", "ndarray", "array", "tablic", "shape", "zeros", "ones", "arange", "reshape",
+               "dtype", "linspace"), ()),
+    ("Sieć", ("socket", "tcp", "udp", "sieć", "sieci", "sieciow", "klient", "bind", "listen", "accept",
+              "recv", "sendall", "connect", "port"), ()),
+    ("Multiprocessing", ("multiprocess", "proces", "process", "pool"), ()),
+    ("Wielowątkowość", ("thread", "wątk", "watk", "wątek", "watek", "wielowątk", "wielowatk", "gil",
+                        "lock", "daemon"), ()),
+    ("Pliki", ("plik", "open", "readlines", "readline", "read", "write", "tryb", "csv", "txt"), ()),
+    ("Moduły i pakiety", ("import", "modu", "pakiet", "__name__", "__main__", "sys"), ()),
+    ("Wyjątki", ("wyjąt", "wyjat", "exception", "try", "except", "finally", "raise", "błąd", "błęd",
+                 "-error", "-exception"), ()),
+    ("OOP", ("klas", "class", "obiekt", "dziedzicz", "self", "super", "__init__", "__str__", "__repr__",
+             "__eq__", "__len__", "__add__", "__call__", "polimorf", "abstrak", "abstractmethod",
+             "instancj", "atrybut", "mro", "enkapsul", "konstrukt"), ()),
+    ("Funkcje", ("def", "args", "kwargs", "argument", "parametr", "funkcj", "return", "domyśln",
+                 "domysln", "global", "nonlocal"), ()),
+    (DEFAULT_TOPIC, ("mutowal", "niemutowal", "list", "tupl", "krotk", "słownik", "slownik", "dict", "set",
+                     "zbiór", "zbior", "string", "napis", "int", "float", "str", "bool", "none", "operator",
+                     "append", "len", "range", "zmienn", "indeks", "slic", "wycin", "typ"), ()),
+]
+
+TOPIC_NAMES = [name for name, _, _ in TOPICS]
+
+# Waga trafień: opis i kod pytania liczą się bardziej niż wyjaśnienie
+QUESTION_WEIGHT = 2
+PATTERN_WEIGHT = 3
+
+
+class TopicClassifier:
+    """Przypisanie tematu po słowach kluczowych (wynik dla danego tokenu zapamiętywany)"""
+
+    def __init__(self, topics=TOPICS):
+        self.names = [name for name, _, _ in topics]
+        # (numer tematu, krotka początków, krotka końcówek) - startswith/endswith sprawdza całą krotkę naraz
+        self.stems = [
+            (i, tuple(s for s in stems if s[0] != '-'), tuple(s[1:] for s in stems if s[0] == '-'))
+            for i, (_, stems, _) in enumerate(topics)
+        ]
+        self.patterns = [(i, re.compile(p)) for i, (_, _, patterns) in enumerate(topics) for p in patterns]
+        self._token_topics = {}
+
+    def token_topics(self, token):
+        """Numery tematów, do których pasuje token"""
+        hit = self._token_topics.get(token)
+        if hit is None:
+            hit = tuple(
+                i for i, prefixes, suffixes in self.stems
+                if token.startswith(prefixes) or (suffixes and token.endswith(suffixes))
+            )
+            self._token_topics[token] = hit
+        return hit
+
+    def classify(self, text, extra=''):
+        """Temat dla treści pytania (`text`) i tekstu pomocniczego (wyjaśnienie)"""
+        scores = Counter()
+        for weight, part in ((QUESTION_WEIGHT, text), (1, extra)):
+            for token in iter_tokens(part):
+                for i in self.token_topics(token):
+                    scores[i] += weight
+        for i, pattern in self.patterns:
+            if pattern.search(text):
+                scores[i] += PATTERN_WEIGHT
+        if not scores:
+            return DEFAULT_TOPIC
+        best = max(scores.items(), key=lambda item: (item[1], -item[0]))[0]
+        return self.names[best]
+
+    def classify_question(self, q):
+        """Temat pytania: jawny tag 'temat' albo klasyfikacja (Question albo rekord JSON).
+
+        Odpowiedzi są pomijane - warianty typu "Błąd" pojawiają się w pytaniach z każdego tematu.
+        """
+        if isinstance(q, dict):
+            return q.get('temat') or self.classify(q['pytanie'], q.get('tlumaczenie', ''))
+        return q.topic or self.classify(q.text, q.explanation)
+
+
+class TopicIndex:
+    """Tematy pytań i gotowe tablice id pytań dla każdego tematu"""
+
+    def __init__(self, topic_of):
+        self.topic_of = topic_of  # id pytania -> temat
+        by_topic = {}
+        for qid, topic in topic_of.items():
+            by_topic.setdefault(topic, array('i')).append(qid)
+        # kolejność: tematy z TOPICS, potem ewentualne jawne tagi spoza listy
+        order = {name: i for i, name in enumerate(TOPIC_NAMES)}
+        self.ids = dict(sorted(by_topic.items(), key=lambda item: (order.get(item[0], len(order)), item[0])))
+
+    @classmethod
+    def build(cls, questions, classifier=None):
+        """Indeks dla listy pytań (Question), klasyfikując te bez jawnego tematu"""
+        classifier = classifier or TopicClassifier()
+        return cls({q.id: classifier.classify_question(q) for q in questions})
+
+    @classmethod
+    def from_sqlite(cls, store):
+        """Indeks z kolumny topic w SqliteStore (tematy policzone przy imporcie bazy)"""
+        return cls(store.question_topics())
+
+    def topics(self):
+        """[(temat, liczba pytań)]"""
+        return [(topic, len(ids)) for topic, ids in self.ids.items()]
+
+    def question_ids(self, topic):
+        return self.ids.get(topic, array('i'))
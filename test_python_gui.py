@@ -4,15 +4,27 @@
 Program testowy Python - GUI z bazą pytań
 """
 
+import time
+
+# Początek importów - punkt odniesienia dla --profile-startup
+STARTUP_START = time.perf_counter()
+
+import argparse
 import json
-import random
 import datetime
 from pathlib import Path
 from tkinter import (
     Tk, ttk, Frame, Label, Button, Radiobutton, StringVar, 
-    Text, Scrollbar, messagebox, font, Canvas
+    Text, Scrollbar, messagebox, font, Canvas, Entry, Listbox
 )
 
+# quiz_adaptive, quiz_search i quiz_analytics importowane dopiero przy pierwszym użyciu
+from quiz_engine import TEST_SIZE, QuizEngine
+from quiz_storage import HistoryStore, JsonQuestionBank, SqliteStore
+from quiz_topics import TopicIndex
+
+IMPORTS_SECONDS = time.perf_counter() - STARTUP_START
+
 # Kolory
 COLOR_CORRECT = "#2d5016"  # ciemnozielony
 COLOR_INCORRECT = "#8b1a1a"  # ciemnoczerwony
@@ -20,36 +32,111 @@ COLOR_BG = "#ffffff"  # biały
 COLOR_LIGHT = "#f5f5f5"
 COLOR_DARK = "#333333"
 
+# Liczba testów na jednej stronie historii
+HISTORY_PAGE_SIZE = 20
+
+# Teoria wstawiana porcjami (linie na jedno wywołanie after), żeby okno nie zamarzało
+THEORY_CHUNK_LINES = 200
+
+# Fazy startu w raporcie --profile-startup (brak fazy = odłożona do pierwszego użycia)
+STARTUP_PHASES = ('imports', 'load_questions', 'load_topics', 'load_history', 'load_theory', 'create_widgets')
+
+# Wyszukiwanie: odczekanie po ostatnim naciśnięciu klawisza (ms) i liczba wyników
+SEARCH_DELAY_MS = 120
+SEARCH_LIMIT = 100
+
 
 class TestPythonGUI:
-    def __init__(self, root):
+    def __init__(self, root, storage='json'):
+        # Czasy faz startu (--profile-startup); fazy odłożone dopisują się przy pierwszym użyciu
+        self.startup_phases = [('imports', IMPORTS_SECONDS)]
+        self.startup_reported = False
+        
         self.root = root
         self.root.title("Test Python - Zaliczenie")
         self.root.geometry("1000x800")
         self.root.configure(bg=COLOR_BG)
         
-        # Załaduj pytania
-        self.questions = self.load_questions()
-        
-        # Historia testów
-        self.history_file = Path(__file__).parent / "test_python_historia.json"
-        self.history = self.load_history()
-        
-        # Stan testu
-        self.current_test = None
-        self.current_question_index = 0
-        self.user_answers = []
-        self.test_start_time = None
-        
-        # Załaduj teorię
-        self.theory_content = self.load_theory()
+        # Magazyn danych: 'json' (pliki) lub 'sqlite' (test_python.db)
+        self.storage = storage
+        self.db = SqliteStore(Path(__file__).parent / "test_python.db") if storage == 'sqlite' else None
+        
+        # Załaduj pytania (przy starcie wystarczą identyfikatory, treść pobieramy przy losowaniu)
+        self.questions_file = Path(__file__).parent / "test_python_baza_pytan.json"
+        self.questions = self.profile_phase('load_questions', self.load_questions)
+        self.topic_index = self.profile_phase('load_topics', self.load_topics)
+        
+        # Historia testów (JSON Lines; stary test_python_historia.json migrowany jednorazowo),
+        # otwierana dopiero przy pierwszym użyciu - patrz history_store
+        self.history_file = Path(__file__).parent / "test_python_historia.jsonl"
+        self.legacy_history_file = Path(__file__).parent / "test_python_historia.json"
+        self._history_store = None
+        
+        # Logika testu (bez GUI) i stan bieżącego testu
+        self.engine = QuizEngine(self.questions, save=self.save_history, topics=self.topic_index)
+        self.session = None
+        
+        # Statystyki: kolumny historii (quiz_analytics) wczytywane przy pierwszym otwarciu zakładki
+        self.stats_columns = None
+        self.stats_dirty = False  # nowe testy od ostatniego przeliczenia zakładki
+        
+        # Pomiar renderowania: render_hook(faza, sekundy), faza 'content' lub 'layout'
+        self.render_hook = None
+        self._layout_job = None
+        self._layout_start = 0.0
+        
+        # Teoria wczytywana przy pierwszym otwarciu zakładki
+        self.theory_file = Path(__file__).parent / "SCIAGA_PYTHON.md"
+        self.theory_content = None
+        self._theory_job = None
+        self._theory_target = None
+        
+        # Wyszukiwanie: indeks budowany przy pierwszym otwarciu zakładki (z cache, jeśli aktualny)
+        self.search_cache_file = Path(__file__).parent / ".search_cache.json"
+        self.search_index = None
+        self.search_results = []
+        self.theory_by_line = None
+        self._search_job = None
         
         # Styl
         self.setup_styles()
         
         # GUI
-        self.create_widgets()
-        
+        self.profile_phase('create_widgets', self.create_widgets)
+    
+    def profile_phase(self, phase, fn, *args):
+        """Wywołaj fn(*args) i zapamiętaj czas fazy startu"""
+        start = time.perf_counter()
+        result = fn(*args)
+        seconds = time.perf_counter() - start
+        self.startup_phases.append((phase, seconds))
+        if self.startup_reported:
+            print(f"  {phase:<22} {seconds * 1000:8.1f} ms  (po starcie)", flush=True)
+        return result
+    
+    def report_startup(self, first_window):
+        """Wypisz czasy faz startu i czas do pierwszego okna (--profile-startup)"""
+        times = dict(self.startup_phases)
+        print("Start programu:", flush=True)
+        for phase in STARTUP_PHASES:
+            if phase in times:
+                print(f"  {phase:<22} {times[phase] * 1000:8.1f} ms")
+            else:
+                print(f"  {phase:<22} {'odłożone':>8}")
+        print(f"  {'pierwsze okno':<22} {first_window * 1000:8.1f} ms  (od uruchomienia)", flush=True)
+        self.startup_reported = True
+    
+    @property
+    def history_store(self):
+        """Historia testów - otwierana przy pierwszym użyciu (zakładka, zapis wyniku, statystyki)"""
+        if self._history_store is None:
+            self._history_store = self.profile_phase('load_history', self.load_history)
+        return self._history_store
+    
+    @history_store.setter
+    def history_store(self, store):
+        self._history_store = store
+    
     def setup_styles(self):
         """Konfiguracja stylów"""
         style = ttk.Style()
@@ -61,43 +148,48 @@ class TestPythonGUI:
         style.map('TNotebook.Tab', background=[('selected', COLOR_BG)])
         
     def load_questions(self):
-        """Załaduj pytania z JSON"""
-        json_file = Path(__file__).parent / "test_python_baza_pytan.json"
+        """Załaduj pytania z JSON (w trybie SQLite: zaimportuj, jeśli JSON się zmienił)"""
+        json_file = self.questions_file
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            if self.db is not None:
+                self.db.import_questions(json_file)
+                return self.db
+            return JsonQuestionBank.from_file(json_file)
         except FileNotFoundError:
             messagebox.showerror("Błąd", f"Nie znaleziono pliku: {json_file}")
-            return []
         except json.JSONDecodeError:
             messagebox.showerror("Błąd", "Błąd odczytu pliku JSON")
-            return []
+        return self.db if self.db is not None else JsonQuestionBank([])
+    
+    def load_topics(self):
+        """Indeks tematów pytań (jawne tagi + klasyfikacja po słowach kluczowych)"""
+        if self.db is not None:
+            return TopicIndex.from_sqlite(self.db)  # tematy policzone przy imporcie bazy
+        return TopicIndex.build(self.questions.questions)
     
     def load_history(self):
-        """Załaduj historię testów"""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        """Otwórz historię testów (bez wczytywania całego pliku)"""
+        store = HistoryStore(self.history_file, legacy_path=self.legacy_history_file)
+        store.migrate_legacy()
+        if self.db is not None:
+            # Jednorazowo przenieś dotychczasową historię do pustej bazy
+            self.db.import_history(store)
+            return self.db
+        return store
     
     def load_theory(self):
         """Załaduj teorię z pliku markdown"""
-        theory_file = Path(__file__).parent / "SCIAGA_PYTHON.md"
         try:
-            with open(theory_file, 'r', encoding='utf-8') as f:
+            with open(self.theory_file, 'r', encoding='utf-8') as f:
                 return f.read()
         except FileNotFoundError:
             return "Nie znaleziono pliku SCIAGA_PYTHON.md"
         except Exception as e:
             return f"Błąd odczytu pliku: {e}"
     
-    def save_history(self):
-        """Zapisz historię testów"""
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(self.history, f, ensure_ascii=False, indent=2)
+    def save_history(self, test_record):
+        """Dopisz test do historii (jedna linia, bez przepisywania pliku)"""
+        self.history_store.append(test_record)
     
     def create_widgets(self):
         """Utwórz główne widgety"""
@@ -110,15 +202,51 @@ class TestPythonGUI:
         self.notebook.add(self.frame_test, text="📝 Test")
         self.create_test_tab()
         
+        # Pozostałe zakładki: przy starcie tylko pusta ramka, zawartość przy pierwszym otwarciu
         # Zakładka 2: Historia
         self.frame_history = Frame(self.notebook, bg=COLOR_BG)
         self.notebook.add(self.frame_history, text="📊 Historia")
-        self.create_history_tab()
         
         # Zakładka 3: Teoria
         self.frame_theory = Frame(self.notebook, bg=COLOR_BG)
         self.notebook.add(self.frame_theory, text="📚 Teoria")
-        self.create_theory_tab()
+        
+        # Zakładka 4: Statystyki
+        self.frame_stats = Frame(self.notebook, bg=COLOR_BG)
+        self.notebook.add(self.frame_stats, text="📈 Statystyki")
+        
+        # Zakładka 5: Szukaj (pytania i ściąga)
+        self.frame_search = Frame(self.notebook, bg=COLOR_BG)
+        self.notebook.add(self.frame_search, text="🔍 Szukaj")
+        
+        self.tab_builders = {
+            str(self.frame_history): self.create_history_tab,
+            str(self.frame_theory): self.create_theory_tab,
+            str(self.frame_stats): self.create_stats_tab,
+            str(self.frame_search): self.create_search_tab,
+        }
+        
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+    
+    def build_tab(self, frame):
+        """Zbuduj zawartość zakładki, jeśli jeszcze nie była otwierana"""
+        builder = self.tab_builders.pop(str(frame), None)
+        if builder is not None:
+            self.profile_phase(builder.__name__, builder)
+    
+    def on_tab_changed(self, event):
+        """Zbuduj i wypełnij zakładkę przy pierwszym otwarciu"""
+        selected = self.notebook.select()
+        self.build_tab(selected)
+        if selected == str(self.frame_stats) and (self.stats_columns is None or self.stats_dirty):
+            self.refresh_statistics()
+        elif selected == str(self.frame_theory) and self.theory_content is None:
+            self.fill_theory()
+        elif selected == str(self.frame_search):
+            if self.search_index is None:
+                self.search_index = self.load_search_index()
+                self.run_search()
+            self.entry_search.focus_set()
     
     def create_test_tab(self):
         """Utwórz zakładkę testu"""
@@ -144,6 +272,42 @@ class TestPythonGUI:
         )
         self.label_info.pack(pady=5)
         
+        # Test z jednego tematu
+        frame_topic = Frame(header, bg=COLOR_BG)
+        frame_topic.pack(pady=(5, 0))
+        
+        Label(
+            frame_topic,
+            text="Temat:",
+            font=font.Font(size=11),
+            bg=COLOR_BG,
+            fg=COLOR_DARK
+        ).pack(side='left', padx=5)
+        
+        self.topic_choices = self.topic_index.topics()
+        self.combo_topic = ttk.Combobox(
+            frame_topic,
+            values=[f"{topic} ({n})" for topic, n in self.topic_choices],
+            state='readonly',
+            width=32
+        )
+        if self.topic_choices:
+            self.combo_topic.current(0)
+        self.combo_topic.pack(side='left', padx=5)
+        
+        self.btn_start_topic = Button(
+            frame_topic,
+            text="▶ Test z tematu",
+            font=font.Font(size=10, weight='bold'),
+            bg="#009688",
+            fg="white",
+            relief='flat',
+            padx=15,
+            pady=4,
+            command=self.start_test_topic
+        )
+        self.btn_start_topic.pack(side='left', padx=5)
+        
         # Ramka z scrollowaniem dla treści
         canvas_frame = Frame(self.frame_test, bg=COLOR_BG)
         canvas_frame.pack(fill='both', expand=True, padx=20, pady=10)
@@ -252,7 +416,12 @@ class TestPythonGUI:
         self.frame_answers.pack(fill='x', pady=(0, 15))
         
         self.answer_var = StringVar(value="")  # Odznaczone domyślnie
+        # Pula radio buttons używana ponownie między pytaniami (bez destroy/tworzenia)
         self.radio_buttons = []
+        self.answers_visible = 0
+        # Wspólne fonty odpowiedzi - tworzone raz, nie przy każdym pytaniu
+        self.font_answer = font.Font(size=11)
+        self.font_answer_bold = font.Font(size=11, weight='bold')
         
         # Wynik poprzedniego pytania
         self.frame_result = Frame(self.frame_question, bg=COLOR_BG)
@@ -310,6 +479,19 @@ class TestPythonGUI:
         )
         self.btn_start_all.pack(side='left', padx=5)
         
+        self.btn_start_adaptive = Button(
+            self.frame_buttons,
+            text="🎯 Powtórka błędów",
+            font=font.Font(size=12, weight='bold'),
+            bg="#FF9800",
+            fg="white",
+            relief='flat',
+            padx=30,
+            pady=10,
+            command=self.start_test_adaptive
+        )
+        self.btn_start_adaptive.pack(side='left', padx=5)
+        
         self.btn_submit = Button(
             self.frame_buttons,
             text="✓ Zatwierdź odpowiedź",
@@ -373,9 +555,47 @@ class TestPythonGUI:
         self.text_history.config(state='disabled')
         scrollbar.config(command=self.text_history.yview)
         
-        # Przycisk odśwież
+        # Nawigacja po stronach + odśwież
+        frame_nav = Frame(self.frame_history, bg=COLOR_BG)
+        frame_nav.pack(pady=10)
+        
+        self.btn_history_newer = Button(
+            frame_nav,
+            text="◀ Nowsze",
+            font=font.Font(size=11),
+            bg="#9E9E9E",
+            fg="white",
+            relief='flat',
+            padx=20,
+            pady=8,
+            command=lambda: self.show_history_page(self.history_page - 1)
+        )
+        self.btn_history_newer.pack(side='left', padx=5)
+        
+        self.label_history_page = Label(
+            frame_nav,
+            text="",
+            font=font.Font(size=11),
+            bg=COLOR_BG,
+            fg=COLOR_DARK
+        )
+        self.label_history_page.pack(side='left', padx=10)
+        
+        self.btn_history_older = Button(
+            frame_nav,
+            text="Starsze ▶",
+            font=font.Font(size=11),
+            bg="#9E9E9E",
+            fg="white",
+            relief='flat',
+            padx=20,
+            pady=8,
+            command=lambda: self.show_history_page(self.history_page + 1)
+        )
+        self.btn_history_older.pack(side='left', padx=5)
+        
         btn_refresh = Button(
-            self.frame_history,
+            frame_nav,
             text="🔄 Odśwież historię",
             font=font.Font(size=11),
             bg="#9E9E9E",
@@ -385,12 +605,114 @@ class TestPythonGUI:
             pady=8,
             command=self.refresh_history
         )
-        btn_refresh.pack(pady=10)
+        btn_refresh.pack(side='left', padx=(20, 5))
         
+        self.history_page = 0
+        self._history_job = None
         self.refresh_history()
     
+    def create_stats_tab(self):
+        """Utwórz zakładkę statystyk"""
+        header = Label(
+            self.frame_stats,
+            text="Statystyki",
+            font=font.Font(size=18, weight='bold'),
+            bg=COLOR_BG,
+            fg=COLOR_DARK
+        )
+        header.pack(pady=20)
+        
+        frame_text = Frame(self.frame_stats, bg=COLOR_BG)
+        frame_text.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        scrollbar = Scrollbar(frame_text)
+        scrollbar.pack(side='right', fill='y')
+        
+        self.text_stats = Text(
+            frame_text,
+            wrap='word',
+            font=font.Font(size=10),
+            bg=COLOR_LIGHT,
+            fg=COLOR_DARK,
+            yscrollcommand=scrollbar.set,
+            relief='flat',
+            padx=15,
+            pady=15
+        )
+        self.text_stats.pack(fill='both', expand=True)
+        scrollbar.config(command=self.text_stats.yview)
+        self.text_stats.config(state='disabled')
+        
+        btn_refresh = Button(
+            self.frame_stats,
+            text="🔄 Przelicz statystyki",
+            font=font.Font(size=11),
+            bg="#9E9E9E",
+            fg="white",
+            relief='flat',
+            padx=20,
+            pady=8,
+            command=self.refresh_statistics
+        )
+        btn_refresh.pack(pady=10)
+    
+    def refresh_statistics(self):
+        """Policz statystyki z historii i pokaż je w zakładce"""
+        self.stats_dirty = False
+        try:
+            # numpy jest potrzebny tylko tutaj - import dopiero przy otwarciu zakładki
+            import quiz_analytics
+        except ImportError:
+            self.set_stats_text("Statystyki wymagają pakietu numpy:\n\n    pip install numpy")
+            return
+        
+        if self.stats_columns is None:
+            # przez history_store - w trybie SQLite najpierw import historii z JSONL do bazy
+            store = self.history_store
+            if self.db is not None:
+                self.stats_columns = quiz_analytics.HistoryColumns.from_sqlite(store)
+            else:
+                self.stats_columns = quiz_analytics.HistoryColumns.from_records(store)
+        
+        if not len(self.stats_columns):
+            self.set_stats_text("Brak historii testów. Rozpocznij test aby zobaczyć statystyki.")
+            return
+        
+        questions = {q.id: q for q in self.questions.get_questions(self.engine.question_ids)}
+        s = quiz_analytics.summary(self.stats_columns, self.topic_index.topic_of)
+        
+        t = s['time']
+        lines = [
+            f"📈 Testów: {s['tests']}   odpowiedzi: {s['answers']}",
+            f"   od {s['first_date'].replace('T', ' ')} do {s['last_date'].replace('T', ' ')}",
+            "",
+            f"Średni wynik: {s['mean_percentage']:.1f}%   najlepszy: {s['best_percentage']:.1f}%"
+            f"   ostatnie 10 testów: {s['recent_mean']:.1f}%",
+            f"Trend: {s['trend_slope']:+.2f} pkt % na test",
+            f"Czas testu: średnio {int(t['mean'] // 60)} min {int(t['mean'] % 60)} sek,"
+            f" mediana {int(t['median'] // 60)} min {int(t['median'] % 60)} sek,"
+            f" na pytanie {t['per_question']:.0f} sek",
+            "",
+            "🔥 Najtrudniejsze pytania:",
+        ]
+        for qid, answered, error_rate in s['hardest']:
+            q = questions.get(qid)
+            text = (q.prose.splitlines() or [''])[0][:70] if q is not None else "(pytania nie ma już w bazie)"
+            lines.append(f"   #{qid}: {error_rate * 100:.0f}% błędów ({answered} odp.) - {text}")
+        lines += ["", "📚 Poprawne odpowiedzi wg tematu:"]
+        for topic, (answered, accuracy) in sorted(s['topics'].items(), key=lambda item: item[1][1]):
+            lines.append(f"   {topic}: {accuracy * 100:.0f}% ({answered} odp.)")
+        
+        self.set_stats_text("\n".join(lines))
+    
+    def set_stats_text(self, text):
+        self.text_stats.config(state='normal')
+        self.text_stats.delete(1.0, 'end')
+        self.text_stats.insert(1.0, text)
+        self.text_stats.config(state='disabled')
+    
     def create_theory_tab(self):
-        """Utwórz zakładkę teorii - wyświetl bezpośrednio zawartość"""
+        """Utwórz zakładkę teorii (treść wstawiana dopiero po otwarciu)"""
         header = Label(
             self.frame_theory,
             text="Teoria Python",
@@ -423,73 +745,245 @@ class TestPythonGUI:
         self.text_theory.pack(fill='both', expand=True)
         
         scrollbar.config(command=self.text_theory.yview)
-        
-        # Wstaw zawartość teorii
+        self.text_theory.config(state='disabled')
+    
+    def fill_theory(self):
+        """Wczytaj teorię i wstawiaj ją porcjami - pierwsza porcja widoczna od razu"""
+        self.theory_content = self.profile_phase('load_theory', self.load_theory)
+        lines = self.theory_content.splitlines(keepends=True)
         self.text_theory.config(state='normal')
         self.text_theory.delete(1.0, 'end')
-        self.text_theory.insert(1.0, self.theory_content)
         self.text_theory.config(state='disabled')
+        self._insert_theory_chunk(lines, 0)
     
-    def start_test(self):
-        """Rozpocznij nowy test (20 pytań)"""
-        # Losuj 20 pytań
-        selected = random.sample(self.questions, min(20, len(self.questions)))
-        
-        self.current_test = {
-            'questions': selected,
-            'answers': [],
-            'correct': 0,
-            'start_time': datetime.datetime.now().isoformat()
-        }
+    def _insert_theory_chunk(self, lines, start):
+        end = start + THEORY_CHUNK_LINES
+        self.text_theory.config(state='normal')
+        self.text_theory.insert('end-1c', ''.join(lines[start:end]))
+        self.text_theory.config(state='disabled')
+        if end < len(lines):
+            self._theory_job = self.root.after(1, self._insert_theory_chunk, lines, end)
+        else:
+            self._theory_job = None
+            if self._theory_target is not None:
+                self._show_theory_target()
+    
+    def show_theory_line(self, line):
+        """Przejdź do zakładki teorii i pokaż linię `line` (np. nagłówek znalezionej sekcji)"""
+        self.build_tab(self.frame_theory)
+        if self.theory_content is None:
+            self.fill_theory()
+        self.notebook.select(self.frame_theory)
+        self._theory_target = line
+        if self._theory_job is None:
+            self._show_theory_target()
+    
+    def _show_theory_target(self):
+        line, self._theory_target = self._theory_target, None
+        self.text_theory.tag_remove('found', 1.0, 'end')
+        self.text_theory.tag_add('found', f'{line}.0', f'{line}.end')
+        self.text_theory.tag_config('found', background="#fff3b0")
+        self.text_theory.yview(f'{line}.0')
+    
+    def create_search_tab(self):
+        """Utwórz zakładkę wyszukiwania"""
+        header = Label(
+            self.frame_search,
+            text="Szukaj w pytaniach i teorii",
+            font=font.Font(size=18, weight='bold'),
+            bg=COLOR_BG,
+            fg=COLOR_DARK
+        )
+        header.pack(pady=20)
         
-        self.user_answers = []
-        self.current_question_index = 0
-        self.test_start_time = datetime.datetime.now()
+        self.search_var = StringVar()
+        self.entry_search = Entry(
+            self.frame_search,
+            textvariable=self.search_var,
+            font=font.Font(size=13),
+            bg=COLOR_LIGHT,
+            fg=COLOR_DARK,
+            relief='flat'
+        )
+        self.entry_search.pack(fill='x', padx=20, ipady=6)
+        self.search_var.trace_add('write', self.on_search_changed)
         
-        # Aktualizuj GUI
-        total_questions = len(selected)
-        self.label_info.config(text=f"Pytanie 1/{total_questions}")
-        self.btn_start.config(state='disabled')
-        self.btn_start_all.config(state='disabled')
-        self.btn_submit.config(state='normal')
-        self.btn_next.config(state='disabled')
+        self.label_search_info = Label(
+            self.frame_search,
+            text="Wpisz co najmniej 3 litery",
+            font=font.Font(size=10),
+            bg=COLOR_BG,
+            fg="#666666",
+            anchor='w'
+        )
+        self.label_search_info.pack(fill='x', padx=20, pady=(5, 5))
         
-        self.show_question(0)
+        # Lista wyników
+        frame_results = Frame(self.frame_search, bg=COLOR_BG)
+        frame_results.pack(fill='both', expand=True, padx=20)
+        
+        scrollbar = Scrollbar(frame_results)
+        scrollbar.pack(side='right', fill='y')
+        
+        self.list_search = Listbox(
+            frame_results,
+            font=font.Font(size=11),
+            bg=COLOR_LIGHT,
+            fg=COLOR_DARK,
+            yscrollcommand=scrollbar.set,
+            relief='flat',
+            activestyle='none',
+            exportselection=False,
+            height=12
+        )
+        self.list_search.pack(fill='both', expand=True)
+        scrollbar.config(command=self.list_search.yview)
+        self.list_search.bind('<<ListboxSelect>>', self.show_search_result)
+        self.list_search.bind('<Double-Button-1>', self.open_search_result)
+        
+        # Podgląd wybranego wyniku
+        self.text_search = Text(
+            self.frame_search,
+            wrap='word',
+            font=font.Font(size=10),
+            bg=COLOR_LIGHT,
+            fg=COLOR_DARK,
+            relief='flat',
+            height=12,
+            padx=15,
+            pady=15
+        )
+        self.text_search.pack(fill='both', expand=True, padx=20, pady=10)
+        self.text_search.config(state='disabled')
     
-    def start_test_all(self):
-        """Rozpocznij test ze wszystkimi pytaniami"""
-        # Użyj wszystkich pytań (przetasowanych)
-        selected = self.questions.copy()
-        random.shuffle(selected)
-        
-        self.current_test = {
-            'questions': selected,
-            'answers': [],
-            'correct': 0,
-            'start_time': datetime.datetime.now().isoformat()
-        }
+    def load_search_index(self):
+        """Indeks wyszukiwania z cache, a gdy pytania lub ściąga się zmieniły - zbuduj go od nowa"""
+        from quiz_search import SearchIndex, source_signature, theory_sections
+        
+        signature = source_signature(self.questions_file, self.theory_file)
+        index = SearchIndex.load(self.search_cache_file, signature)
+        if index is None:
+            questions = self.questions.get_questions(self.engine.question_ids)
+            index = SearchIndex.build(questions, theory_sections(self.load_theory()), signature)
+            try:
+                index.save(self.search_cache_file)
+            except OSError:
+                pass  # bez cache - przy następnym uruchomieniu indeks zostanie zbudowany ponownie
+        return index
+    
+    def on_search_changed(self, *args):
+        """Szukaj dopiero po chwili bez pisania - nie przy każdym klawiszu"""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(SEARCH_DELAY_MS, self.run_search)
+    
+    def run_search(self):
+        """Wyszukaj i pokaż listę wyników"""
+        self._search_job = None
+        if self.search_index is None:
+            return
+        start = time.perf_counter()
+        self.search_results = self.search_index.search(self.search_var.get(), SEARCH_LIMIT)
+        elapsed = (time.perf_counter() - start) * 1000
         
-        self.user_answers = []
-        self.current_question_index = 0
-        self.test_start_time = datetime.datetime.now()
+        self.list_search.delete(0, 'end')
+        for kind, ref, title, score in self.search_results:
+            label = f"#{ref}" if kind == 'pytanie' else "📚"
+            self.list_search.insert('end', f"{label}  {title}")
+        
+        if not self.search_var.get().strip():
+            info = "Wpisz co najmniej 3 litery"
+        else:
+            info = f"Wyników: {len(self.search_results)} ({elapsed:.1f} ms)"
+        self.label_search_info.config(text=info)
+        self.set_search_text("")
+    
+    def show_search_result(self, event=None):
+        """Podgląd zaznaczonego wyniku: pytanie z odpowiedziami albo sekcja teorii"""
+        selection = self.list_search.curselection()
+        if not selection:
+            return
+        kind, ref, title, score = self.search_results[selection[0]]
+        if kind == 'pytanie':
+            q = self.questions.get_questions([ref])[0]
+            lines = [f"Pytanie #{q.id} ({self.topic_index.topic_of.get(q.id, '')})", "", q.text, ""]
+            for i, answer in enumerate(q.answers):
+                mark = "✓" if i == q.correct else " "
+                lines.append(f"  {mark} {chr(65 + i)}) {answer}")
+            if q.explanation:
+                lines += ["", f"💡 {q.explanation}"]
+        else:
+            if self.theory_by_line is None:
+                from quiz_search import theory_sections
+                self.theory_by_line = {
+                    line: body for line, _, body in theory_sections(self.load_theory())
+                }
+            lines = [f"📚 {title}", "", self.theory_by_line.get(ref, ""), "",
+                     "(dwuklik - otwórz w zakładce Teoria)"]
+        self.set_search_text("\n".join(lines))
+    
+    def open_search_result(self, event=None):
+        """Dwuklik na sekcji teorii przenosi do niej w zakładce Teoria"""
+        selection = self.list_search.curselection()
+        if selection and self.search_results[selection[0]][0] == 'teoria':
+            self.show_theory_line(self.search_results[selection[0]][1])
+    
+    def set_search_text(self, text):
+        self.text_search.config(state='normal')
+        self.text_search.delete(1.0, 'end')
+        self.text_search.insert(1.0, text)
+        self.text_search.config(state='disabled')
+    
+    def start_test(self):
+        """Rozpocznij nowy test (20 pytań)"""
+        self.begin_test(self.engine.start(TEST_SIZE))
+    
+    def start_test_all(self):
+        """Rozpocznij test ze wszystkimi pytaniami (przetasowanymi)"""
+        self.begin_test(self.engine.start(None))
+    
+    def start_test_adaptive(self):
+        """Rozpocznij test (20 pytań) z przewagą pytań, na które często odpowiadano źle"""
+        if self.engine.selector is None:
+            from quiz_adaptive import AdaptiveSelector
+            
+            # Statystyki liczone raz z całej historii, potem aktualizowane po każdym teście
+            self.engine.selector = AdaptiveSelector.from_history(self.engine.question_ids, self.history_store)
+        self.begin_test(self.engine.start(TEST_SIZE, adaptive=True))
+    
+    def start_test_topic(self):
+        """Rozpocznij test (do 20 pytań) z tematu wybranego na liście"""
+        choice = self.combo_topic.current()
+        if choice < 0:
+            messagebox.showwarning("Uwaga", "Wybierz temat!")
+            return
+        topic = self.topic_choices[choice][0]
+        self.begin_test(self.engine.start(TEST_SIZE, topic=topic))
+    
+    def begin_test(self, session):
+        """Pokaż pierwsze pytanie nowej sesji"""
+        self.session = session
         
         # Aktualizuj GUI
-        total_questions = len(selected)
-        self.label_info.config(text=f"Pytanie 1/{total_questions}")
+        self.label_info.config(text=f"Pytanie 1/{session.total}")
         self.btn_start.config(state='disabled')
         self.btn_start_all.config(state='disabled')
+        self.btn_start_adaptive.config(state='disabled')
+        self.btn_start_topic.config(state='disabled')
         self.btn_submit.config(state='normal')
         self.btn_next.config(state='disabled')
         
-        self.show_question(0)
+        self.show_question()
     
-    def show_question(self, index):
-        """Wyświetl pytanie"""
-        if index >= len(self.current_test['questions']):
+    def show_question(self):
+        """Wyświetl bieżące pytanie sesji"""
+        current = self.engine.question(self.session)
+        if current is None:
             self.finish_test()
             return
         
-        question = self.current_test['questions'][index]
+        question, order = current
+        start = time.perf_counter()
         
         # Wyczyść poprzednie wyniki
         self.label_result.config(text="")
@@ -501,98 +995,82 @@ class TestPythonGUI:
         self.code_frame.pack_forget()
         self.code_label.pack_forget()
         
-        # Sprawdź czy jest kod w pytaniu
-        pytanie_text = question['pytanie']
-        code_snippet = None
+        # Pytanie jest już podzielone na opis i kod (quiz_model.Question)
+        typ_emoji = "💻" if question.typ == 'kod' else "📖"
+        pytanie_display = f"{typ_emoji} {question.typ.upper()}\n\n{question.prose}"
         
-        if '```python' in pytanie_text:
-            # Wyodrębnij kod
-            parts = pytanie_text.split('```python')
-            pytanie_bez_kodu = parts[0].strip()
+        if question.code is not None:
+            # Pokaż etykietę i pole kodu
+            self.code_label.pack(fill='x', pady=(10, 5), before=self.frame_answers)
             
-            if len(parts) > 1:
-                code_part = parts[1].split('```')[0].strip()
-                code_snippet = code_part
-                
-                # Wyświetl pytanie bez kodu
-                typ_emoji = "💻" if question['typ'] == 'kod' else "📖"
-                pytanie_display = f"{typ_emoji} {question['typ'].upper()}\n\n{pytanie_bez_kodu}"
-                
-                # Pokaż etykietę i pole kodu
-                self.code_label.pack(fill='x', pady=(10, 5), before=self.frame_answers)
-                
-                # Wyświetl kod w osobnym polu - jak w edytorze
-                self.text_code.config(state='normal')
-                self.text_code.delete(1.0, 'end')
-                self.text_code.insert(1.0, code_snippet)
-                
-                # Ustaw dynamiczną wysokość na podstawie liczby linii (min 10, max 35 linii)
-                # Zwiększamy maksymalną wysokość, aby pokazać więcej kodu na raz
-                num_lines = code_snippet.count('\n') + 1
-                code_height = max(10, min(35, num_lines + 3))  # +3 dla marginesu, max 35 linii
-                self.text_code.config(height=code_height)
-                
-                # Jeśli kod jest dłuższy niż maksymalna wysokość, scrollbar będzie widoczny
-                # Przewiń na górę, aby pokazać początek kodu
-                self.text_code.see("1.0")
-                
-                self.text_code.config(state='disabled')
-                # Pakuj frame z kodem i scrollbarem
-                self.code_frame.pack(fill='both', expand=True, pady=(0, 15), before=self.frame_answers)
-        else:
-            # Pytanie bez kodu
-            typ_emoji = "💻" if question['typ'] == 'kod' else "📖"
-            pytanie_display = f"{typ_emoji} {question['typ'].upper()}\n\n{pytanie_text}"
+            # Wyświetl kod w osobnym polu - jak w edytorze
+            self.text_code.config(state='normal')
+            self.text_code.delete(1.0, 'end')
+            self.text_code.insert(1.0, question.code)
+            
+            # Ustaw dynamiczną wysokość na podstawie liczby linii (min 10, max 35 linii)
+            # Zwiększamy maksymalną wysokość, aby pokazać więcej kodu na raz
+            code_height = max(10, min(35, question.code_lines + 3))  # +3 dla marginesu, max 35 linii
+            self.text_code.config(height=code_height)
+            
+            # Jeśli kod jest dłuższy niż maksymalna wysokość, scrollbar będzie widoczny
+            # Przewiń na górę, aby pokazać początek kodu
+            self.text_code.see("1.0")
+            
+            self.text_code.config(state='disabled')
+            # Pakuj frame z kodem i scrollbarem
+            self.code_frame.pack(fill='both', expand=True, pady=(0, 15), before=self.frame_answers)
         
         # Wyświetl pytanie
         self.text_question.config(state='normal')
         self.text_question.delete(1.0, 'end')
         self.text_question.insert(1.0, pytanie_display)
         
-        # Oblicz liczbę linii i dostosuj wysokość dynamicznie
-        # Użyj update_idletasks aby zaktualizować rozmiar widgetu przed obliczeniem
-        self.text_question.update_idletasks()
-        num_lines = int(self.text_question.index('end-1c').split('.')[0])
+        # Wysokość z liczby linii policzonej przy wczytaniu (nagłówek + pusta linia + opis)
+        num_lines = question.prose_lines + 2
         # Większy zakres - min 4 linie, max 30 linii aby pomieścić długie pytania
         question_height = max(4, min(30, num_lines + 2))
         self.text_question.config(height=question_height)
         
         self.text_question.config(state='disabled')
         
-        # Usuń stare radio buttons
-        for rb in self.radio_buttons:
-            rb.destroy()
-        self.radio_buttons = []
-        
-        # Losuj kolejność odpowiedzi
-        original_answers = question['odpowiedzi']
-        original_correct = question['prawidlowa']
-        
-        # Utwórz listę indeksów i przetasuj je
-        indices = list(range(len(original_answers)))
-        random.shuffle(indices)
-        
-        # Przetasuj odpowiedzi zgodnie z nową kolejnością
-        shuffled_answers = [original_answers[i] for i in indices]
-        
-        # Znajdź nowy indeks prawidłowej odpowiedzi
-        # original_correct wskazuje na oryginalną pozycję, musimy znaleźć gdzie jest teraz
-        shuffled_correct = indices.index(original_correct)
+        # Kolejność odpowiedzi wylosowana przez silnik dla tej sesji
+        # Pokaż odpowiedzi w radio buttons z puli - upewnij się, że są odznaczone
+        self.answer_var.set("")  # Odznacz wszystkie - użyj istniejącej zmiennej
+        self.show_answers(order.answers)
         
-        # Zapisz przetasowane dane w pytaniu (jako pola tymczasowe)
-        question['_shuffled_answers'] = shuffled_answers
-        question['_shuffled_correct'] = shuffled_correct
-        question['_shuffle_mapping'] = indices  # mapowanie: nowy_indeks -> stary_indeks
+        # Aktualizuj info
+        self.label_info.config(
+            text=f"Pytanie {self.session.index + 1}/{self.session.total}"
+        )
         
-        # Utwórz nowe radio buttons - upewnij się, że są odznaczone
-        self.answer_var.set("")  # Odznacz wszystkie - użyj istniejącej zmiennej
-        for i, odp in enumerate(shuffled_answers):
+        # Geometria liczona raz, po wszystkich zmianach treści (bez wymuszania update_idletasks)
+        self._layout_start = time.perf_counter()
+        if self.render_hook:
+            self.render_hook('content', self._layout_start - start)
+        self.schedule_layout()
+    
+    def schedule_layout(self):
+        """Zaplanuj jedną aktualizację scrollowania na czas bezczynności Tk"""
+        if self._layout_job is None:
+            self._layout_job = self.root.after_idle(self._apply_layout)
+    
+    def _apply_layout(self):
+        """Aktualizuj scrollregion i przewiń na górę - po przeliczeniu geometrii przez Tk"""
+        self._layout_job = None
+        self.test_canvas.configure(scrollregion=self.test_canvas.bbox("all"))
+        self.test_canvas.yview_moveto(0)
+        if self.render_hook:
+            self.render_hook('layout', time.perf_counter() - self._layout_start)
+    
+    def show_answers(self, answers):
+        """Skonfiguruj radio buttons z puli dla odpowiedzi; brakujące dotwórz, nadmiarowe ukryj"""
+        while len(self.radio_buttons) < len(answers):
             rb = Radiobutton(
                 self.frame_answers,
-                text=odp,
                 variable=self.answer_var,
-                value=str(i),
-                font=font.Font(size=11),
+                value=str(len(self.radio_buttons)),
+                font=self.font_answer,
                 bg=COLOR_BG,
                 fg=COLOR_DARK,
                 activebackground=COLOR_LIGHT,
@@ -602,27 +1080,18 @@ class TestPythonGUI:
                 padx=10,
                 pady=5
             )
-            rb.pack(fill='x', padx=5, pady=2)
             self.radio_buttons.append(rb)
         
-        # Aktualizuj info
-        total_questions = len(self.current_test['questions'])
-        self.label_info.config(
-            text=f"Pytanie {index + 1}/{total_questions}"
-        )
+        for i, odp in enumerate(answers):
+            # Przywróć wygląd po podświetleniu z poprzedniego pytania
+            self.radio_buttons[i].config(text=odp, fg=COLOR_DARK, font=self.font_answer)
         
-        # Aktualizuj scrollowanie i przewiń na górę
-        self.frame_question.update_idletasks()
-        if hasattr(self, 'test_canvas'):
-            self.test_canvas.configure(scrollregion=self.test_canvas.bbox("all"))
-            self.test_canvas.yview_moveto(0)
-        
-        # Aktualizuj scrollowanie
-        self.frame_question.update_idletasks()
-        if hasattr(self, 'test_canvas'):
-            self.test_canvas.configure(scrollregion=self.test_canvas.bbox("all"))
-            # Przewiń na górę
-            self.test_canvas.yview_moveto(0)
+        # Pakujemy tylko różnicę - kolejność w frame_answers zostaje zachowana
+        for rb in self.radio_buttons[self.answers_visible:len(answers)]:
+            rb.pack(fill='x', padx=5, pady=2)
+        for rb in self.radio_buttons[len(answers):self.answers_visible]:
+            rb.pack_forget()
+        self.answers_visible = len(answers)
     
     def submit_answer(self):
         """Zatwierdź odpowiedź"""
@@ -632,36 +1101,11 @@ class TestPythonGUI:
             messagebox.showwarning("Uwaga", "Wybierz odpowiedź!")
             return
         
-        question = self.current_test['questions'][self.current_question_index]
-        user_choice = int(selected)
-        
-        # Użyj przetasowanego indeksu prawidłowej odpowiedzi
-        if '_shuffled_correct' in question:
-            correct_choice = question['_shuffled_correct']
-            shuffled_answers = question['_shuffled_answers']
-        else:
-            # Fallback dla starych pytań (bez przetasowania)
-            correct_choice = question['prawidlowa']
-            shuffled_answers = question['odpowiedzi']
-        
-        is_correct = user_choice == correct_choice
-        
-        # Zapisz odpowiedź (używając oryginalnego indeksu dla historii)
-        original_user_choice = user_choice
-        original_correct_choice = question['prawidlowa']
-        if '_shuffle_mapping' in question:
-            # Konwertuj z powrotem na oryginalny indeks
-            original_user_choice = question['_shuffle_mapping'][user_choice]
-        
-        self.user_answers.append({
-            'question_id': question['id'],
-            'user_answer': original_user_choice,
-            'correct_answer': original_correct_choice,
-            'is_correct': is_correct
-        })
-        
-        if is_correct:
-            self.current_test['correct'] += 1
+        # Ocena i zapis odpowiedzi w silniku (oryginalne indeksy trafią do historii)
+        result = self.engine.answer(self.session, int(selected))
+        is_correct = result.is_correct
+        user_choice = result.choice
+        correct_choice = result.correct_choice
         
         # Pokaż wynik
         if is_correct:
@@ -670,7 +1114,7 @@ class TestPythonGUI:
                 fg=COLOR_CORRECT
             )
         else:
-            correct_text = shuffled_answers[correct_choice]
+            correct_text = result.correct_text
             self.label_result.config(
                 text=f"✗ Niepoprawna odpowiedź. Prawidłowa: {correct_text}",
                 fg=COLOR_INCORRECT
@@ -679,63 +1123,53 @@ class TestPythonGUI:
             # Pokaż tłumaczenie
             self.text_explanation.config(state='normal')
             self.text_explanation.delete(1.0, 'end')
-            self.text_explanation.insert(1.0, f"💡 {question['tlumaczenie']}")
+            self.text_explanation.insert(1.0, f"💡 {result.question.explanation}")
             self.text_explanation.config(state='disabled')
         
         # Podświetl wybrane odpowiedzi
-        for i, rb in enumerate(self.radio_buttons):
+        for i, rb in enumerate(self.radio_buttons[:self.answers_visible]):
             if i == user_choice:
                 rb.config(fg=COLOR_INCORRECT if not is_correct else COLOR_CORRECT)
             if i == correct_choice and not is_correct:
-                rb.config(fg=COLOR_CORRECT, font=font.Font(size=11, weight='bold'))
+                rb.config(fg=COLOR_CORRECT, font=self.font_answer_bold)
         
         # Aktualizuj przyciski
         self.btn_submit.config(state='disabled')
         
         # Jeśli to ostatnie pytanie, zmień na "Zakończ test"
-        if self.current_question_index == len(self.current_test['questions']) - 1:
+        if self.session.done:
             self.btn_next.config(text="🏁 Zakończ test")
         
         self.btn_next.config(state='normal')
     
     def next_question(self):
         """Następne pytanie"""
-        self.current_question_index += 1
-        
-        if self.current_question_index >= len(self.current_test['questions']):
+        if self.session.done:
             self.finish_test()
         else:
-            self.show_question(self.current_question_index)
+            self.show_question()
             self.btn_submit.config(state='normal')
             
-            # Przywróć przycisk
-            if self.current_question_index == len(self.current_test['questions']) - 1:
+            # Przywróć przycisk (aktywny dopiero po odpowiedzi - silnik nie kończy testu bez niej)
+            if self.session.index == self.session.total - 1:
                 self.btn_next.config(text="🏁 Zakończ test")
             else:
                 self.btn_next.config(text="⏭ Następne pytanie")
-                self.btn_next.config(state='disabled')
+            self.btn_next.config(state='disabled')
     
     def finish_test(self):
         """Zakończ test i pokaż wyniki"""
-        total = len(self.current_test['questions'])
-        correct = self.current_test['correct']
-        percentage = (correct / total) * 100
-        
-        end_time = datetime.datetime.now()
-        duration = (end_time - self.test_start_time).total_seconds()
-        
-        # Zapisz do historii
-        test_record = {
-            'date': datetime.datetime.now().isoformat(),
-            'duration_seconds': int(duration),
-            'total': total,
-            'correct': correct,
-            'percentage': round(percentage, 1),
-            'answers': self.user_answers
-        }
-        
-        self.history.insert(0, test_record)  # Dodaj na początek
-        self.save_history()
+        # Silnik liczy wynik i zapisuje go do historii (save_history)
+        record = self.engine.finish(self.session)
+        if self.stats_columns is not None:
+            # Kolumny statystyk uzupełniamy o jeden test zamiast wczytywać historię od nowa
+            self.stats_columns.extend([record])
+            # zakładka jest zwykle ukryta - przeliczymy ją przy następnym otwarciu
+            self.stats_dirty = True
+        total = record['total']
+        correct = record['correct']
+        percentage = (correct / total) * 100 if total else 0.0
+        duration = record['duration_seconds']
         
         # Pokaż wyniki
         result_text = f"""
@@ -763,14 +1197,13 @@ Czas: {int(duration // 60)} min {int(duration % 60)} sek
         self.reset_test()
         
         # Przejdź do historii
-        self.notebook.select(1)
+        self.build_tab(self.frame_history)
+        self.notebook.select(self.frame_history)
         self.refresh_history()
     
     def reset_test(self):
         """Reset stanu testu"""
-        self.current_test = None
-        self.current_question_index = 0
-        self.user_answers = []
+        self.session = None
         
         self.text_question.config(state='normal')
         self.text_question.delete(1.0, 'end')
@@ -782,9 +1215,8 @@ Czas: {int(duration // 60)} min {int(duration % 60)} sek
         self.code_frame.pack_forget()
         self.code_label.pack_forget()
         
-        for rb in self.radio_buttons:
-            rb.destroy()
-        self.radio_buttons = []
+        # Ukryj radio buttons (zostają w puli na następny test)
+        self.show_answers([])
         
         # Odznacz wszystkie radio buttons
         self.answer_var.set("")
@@ -798,20 +1230,42 @@ Czas: {int(duration // 60)} min {int(duration % 60)} sek
         
         self.btn_start.config(state='normal')
         self.btn_start_all.config(state='normal')
+        self.btn_start_adaptive.config(state='normal')
+        self.btn_start_topic.config(state='normal')
         self.btn_submit.config(state='disabled')
         self.btn_next.config(state='disabled')
         self.btn_next.config(text="⏭ Następne pytanie")
     
     def refresh_history(self):
-        """Odśwież historię testów"""
+        """Odśwież historię testów (wróć na pierwszą stronę)"""
+        self.show_history_page(0)
+    
+    def show_history_page(self, page):
+        """Pokaż stronę historii - wczytanie odłożone do after_idle, kolejne kliknięcia się scalają"""
+        self.history_page = max(0, page)
+        if self._history_job is None:
+            self._history_job = self.root.after_idle(self._render_history_page)
+    
+    def _render_history_page(self):
+        """Wczytaj z magazynu i wyświetl tylko bieżącą stronę historii"""
+        self._history_job = None
+        offset = self.history_page * HISTORY_PAGE_SIZE
+        # o jeden więcej - tak wiemy, czy istnieje starsza strona, bez liczenia całej historii
+        tests = self.history_store.recent(HISTORY_PAGE_SIZE + 1, offset=offset)
+        has_older = len(tests) > HISTORY_PAGE_SIZE
+        tests = tests[:HISTORY_PAGE_SIZE]
+        
         self.text_history.config(state='normal')
         self.text_history.delete(1.0, 'end')
         
-        if not self.history:
-            self.text_history.insert(1.0, "Brak historii testów. Rozpocznij test aby zapisać wynik.")
+        if not tests:
+            if self.history_page:
+                self.text_history.insert(1.0, "Brak starszych testów.")
+            else:
+                self.text_history.insert(1.0, "Brak historii testów. Rozpocznij test aby zapisać wynik.")
         else:
-            history_text = ""
-            for i, test in enumerate(self.history[:20], 1):  # Max 20 ostatnich
+            entries = []
+            for i, test in enumerate(tests, offset + 1):
                 date = datetime.datetime.fromisoformat(test['date'])
                 date_str = date.strftime("%Y-%m-%d %H:%M")
                 
@@ -820,21 +1274,45 @@ Czas: {int(duration // 60)} min {int(duration % 60)} sek
                 
                 emoji = "🎉" if test['percentage'] >= 90 else "👍" if test['percentage'] >= 70 else "📚"
                 
-                history_text += f"""
-{emoji} Test #{i} - {date_str}
+                entries.append(f"""{emoji} Test #{i} - {date_str}
    Wynik: {test['correct']}/{test['total']} ({test['percentage']}%)
    Czas: {duration_min} min {duration_sec} sek
-   {'─' * 50}
-"""
+   {'─' * 50}""")
             
-            self.text_history.insert(1.0, history_text.strip())
+            self.text_history.insert(1.0, "\n\n".join(entries))
         
         self.text_history.config(state='disabled')
+        self.text_history.yview_moveto(0)
+        
+        self.label_history_page.config(text=f"Strona {self.history_page + 1}")
+        self.btn_history_newer.config(state='normal' if self.history_page > 0 else 'disabled')
+        self.btn_history_older.config(state='normal' if has_older else 'disabled')
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Test Python - program testowy z GUI")
+    parser.add_argument(
+        '--storage',
+        choices=['json', 'sqlite'],
+        default='json',
+        help="magazyn pytań i historii: pliki JSON (domyślnie) lub baza SQLite test_python.db"
+    )
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help="wypisz czasy faz startu i czas do pojawienia się okna"
+    )
+    args = parser.parse_args()
+    
     root = Tk()
-    app = TestPythonGUI(root)
+    app = TestPythonGUI(root, storage=args.storage)
+    if args.profile_startup:
+        def on_map(event):
+            if event.widget is root:
+                root.unbind('<Map>')
+                # pierwsze odrysowanie okna następuje w najbliższej bezczynności pętli
+                root.after_idle(lambda: app.report_startup(time.perf_counter() - STARTUP_START))
+        root.bind('<Map>', on_map)
     root.mainloop()
 
 
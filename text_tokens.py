@@ -0,0 +1,123 @@
+"""
+Tokenizer tekstu wspólny dla analizatora pokrycia (analyze_pdfs_coverage.py)
+i programu testowego (tematy pytań, wyszukiwanie) – bez zależności od pypdf/numpy.
+"""
+
+from __future__ import annotations
+
+import re
+from itertools import filterfalse
+from typing import Iterator
+
+
+STOPWORDS = {
+    # PL (minimalny zestaw + typowe słowa z prezentacji/testów)
+    "i",
+    "oraz",
+    "a",
+    "ale",
+    "albo",
+    "lub",
+    "że",
+    "to",
+    "te",
+    "ta",
+    "ten",
+    "tę",
+    "tych",
+    "tym",
+    "w",
+    "we",
+    "na",
+    "do",
+    "od",
+    "dla",
+    "po",
+    "pod",
+    "nad",
+    "z",
+    "ze",
+    "o",
+    "u",
+    "jak",
+    "jaki",
+    "jaka",
+    "jakie",
+    "czy",
+    "co",
+    "kiedy",
+    "gdzie",
+    "który",
+    "która",
+    "które",
+    "których",
+    "którym",
+    "się",
+    "nie",
+    "tak",
+    "taka",
+    "takie",
+    "tego",
+    "tej",
+    "temu",
+    "jest",
+    "są",
+    "być",
+    "bywa",
+    "będzie",
+    "będą",
+    "może",
+    "można",
+    "np",
+    "itp",
+    "etc",
+    "przykład",
+    "przyklad",
+    "zadanie",
+    "pytanie",
+    "test",
+    # EN (typowe w slajdach)
+    "the",
+    "and",
+    "or",
+    "a",
+    "an",
+    "to",
+    "of",
+    "in",
+    "on",
+    "for",
+    "with",
+    "as",
+    "is",
+    "are",
+    "be",
+    "this",
+    "that",
+    "these",
+    "those",
+    "from",
+    "by",
+    "at",
+    "it",
+    "its",
+    "into",
+    "about",
+    "example",
+    "examples",
+    "python",
+}
+
+
+# Minimalna długość (3 znaki) wymuszana już w regexie – krótsze tokeny i tak były odrzucane.
+TOKEN_RE = re.compile(r"[A-Za-zĄĆĘŁŃÓŚŹŻąćęłńóśźż_]{3,}")
+
+
+def iter_tokens(s: str) -> Iterator[str]:
+    # Na tokeny wpływa tylko usunięcie soft hyphen (myślniki i spacje nie należą do TOKEN_RE),
+    # więc osobna normalizacja tekstu jest tu zbędna; stopwords odsiewane w C przez filterfalse.
+    return filterfalse(STOPWORDS.__contains__, TOKEN_RE.findall(s.replace("\u00ad", "").lower()))
+
+
+def tokenize(s: str) -> list[str]:
+    return list(iter_tokens(s))